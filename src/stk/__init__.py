@@ -26,12 +26,21 @@ else:
 console = Console(emoji=False, log_path=False, stderr=True)
 clog = console.log
 
+# Use libyaml-backed loader/dumper when pyyaml has been built with it; it's
+# considerably faster than the pure-python implementation.
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper  # type: ignore
+
 # This makes yaml.dump() output `foo: ` rather than `foo: null`
 #
-yaml.SafeDumper.add_representer(
-    type(None),
-    lambda x, value: x.represent_scalar("tag:yaml.org,2002:null", "")
-)
+def _represent_none(dumper, _):
+    return dumper.represent_scalar("tag:yaml.org,2002:null", "")
+
+
+yaml.SafeDumper.add_representer(type(None), _represent_none)
+SafeDumper.add_representer(type(None), _represent_none)
 
 
 class ConfigException(Exception):
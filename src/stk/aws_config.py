@@ -2,8 +2,14 @@ from dataclasses import dataclass
 
 import boto3
 
+from botocore.config import Config
+
 from . import log
 
+# Keep connections alive between the (sometimes long) gaps while polling stack status, and let
+# botocore rate-limit and retry when CloudFormation throttles us (StackWaiter relies on this).
+CLIENT_CONFIG = Config(tcp_keepalive=True, retries={"mode": "adaptive", "max_attempts": 10})
+
 
 @dataclass
 class AwsSettings:
@@ -21,12 +27,19 @@ class AwsSettings:
     def __post_init__(self):
         self.__session = None
         self.__checked_account = False
+        # Creating a client is relatively expensive (loads the service model), and clients are
+        # thread-safe, so they're shared. Keyed by region as well since copies of these settings
+        # (e.g. for stack references in another region) share this dict.
+        self.__clients = {}
 
     def client(self, service):
         """Returns boto client for given service"""
-        session = self._session()
-        log.info("client(%s), account_id=%s", service, self.account_id)
-        return session.client(service, region_name=self.region)
+        key = (service, self.region)
+        if key not in self.__clients:
+            session = self._session()
+            log.info("client(%s), account_id=%s", service, self.account_id)
+            self.__clients[key] = session.client(service, region_name=self.region, config=CLIENT_CONFIG)
+        return self.__clients[key]
 
     def resource(self, service):
         """Returns boto resource for given service"""
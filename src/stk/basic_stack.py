@@ -12,7 +12,11 @@ class BasicStack:
         self.aws = aws
         self.name = name
         self.cfn = aws.client("cloudformation")
-        self.bucket = CfnBucket(aws)
+
+    @property
+    def bucket(self) -> CfnBucket:
+        """Bucket for uploading templates; only looked up when needed (not at all for stack references)"""
+        return CfnBucket.shared(self.aws)
 
     def exists(self):
         """Tests if stack with .name exists"""
@@ -3,6 +3,7 @@ from __future__ import annotations
 import boto3
 import botocore
 
+from boto3.s3.transfer import TransferConfig
 from dataclasses import dataclass
 
 from .aws_config import AwsSettings
@@ -15,6 +16,10 @@ class Uploadable:
     def key(self) -> str:
         pass
 
+    def content_md5(self) -> str:
+        """Base64-encoded MD5 digest of body(), if already known (sent as Content-MD5)"""
+        return None
+
 
 @dataclass
 class CfnBucketObject:
@@ -25,37 +30,76 @@ class CfnBucketObject:
         """
         Return http url for object
         """
-        s3_hostname = f"{self.bucket.bucket_name}.s3.{self.bucket.region}.amazonaws.com"
-        return "/".join(["https:/", s3_hostname, self.key])
+        return f"https://{self.bucket.hostname}/{self.key}"
 
     def as_s3(self) -> str:
         """
         Return s3:// url for object
         """
-        return "/".join(["s3:/", self.bucket.bucket_name, self.key])
+        return f"s3://{self.bucket.bucket_name}/{self.key}"
+
+
+# CfnBucket instances shared between stacks and template helpers, keyed by (bucket, region, s3 client)
+_SHARED_BUCKETS = {}
 
 
 class CfnBucket:
     FORCE_OVERWRITE = False
 
+    # File bodies (e.g. zipped lambda code) are uploaded via the transfer manager, which switches
+    # to concurrent multipart uploads above multipart_threshold (default 8MiB). S3 parts must be at
+    # least 5MiB, so templates (max 1MB) are always sent with a single put_object().
+    TRANSFER_CONFIG = TransferConfig()
+
     def __init__(self, config: AwsSettings):
         self.bucket_name = config.cfn_bucket
         self.region = config.region
+        self.hostname = f"{self.bucket_name}.s3.{self.region}.amazonaws.com"
         self.s3 = config.client("s3")
 
+        # Keys of objects known to be in the bucket. Keys are content-addressed, so once present an
+        # object doesn't need to be checked again (e.g. template is uploaded for validation, then for
+        # the change set)
+        self._uploaded = set()
+
+    @classmethod
+    def shared(cls, config: AwsSettings) -> CfnBucket:
+        """
+        Returns CfnBucket for `config`, shared with other users of the same settings (and therefore
+        the same S3 client), so they also share knowledge of objects already uploaded.
+        """
+        key = (config.cfn_bucket, config.region, config.client("s3"))
+        if key not in _SHARED_BUCKETS:
+            _SHARED_BUCKETS[key] = cls(config)
+        return _SHARED_BUCKETS[key]
+
     # Upload content object to S3 bucket
     def upload(self, object: Uploadable, overwrite: bool = False):
         s3 = self.s3
+        key = object.key()
 
         if self.FORCE_OVERWRITE:
-            s3.put_object(Bucket=self.bucket_name, Key=object.key(), Body=object.body(), ServerSideEncryption="AES256")
-        else:
+            self._put(object, key)
+        elif key not in self._uploaded:
             try:
-                s3.head_object(Bucket=self.bucket_name, Key=object.key())
+                s3.head_object(Bucket=self.bucket_name, Key=key)
                 # print(f"Key {object.key()} already exists in {self.bucket_name}, not uploading")
             except botocore.exceptions.ClientError as ex:
                 if ex.response["ResponseMetadata"]["HTTPStatusCode"] == 404:
-                    s3.put_object(Bucket=self.bucket_name, Key=object.key(), Body=object.body(), ServerSideEncryption="AES256")
+                    self._put(object, key)
                 else:
                     raise
-        return CfnBucketObject(self, object.key())
+            self._uploaded.add(key)
+        return CfnBucketObject(self, key)
+
+    def _put(self, object: Uploadable, key: str):
+        body = object.body()
+        if not isinstance(body, (bytes, str)):
+            self.s3.upload_fileobj(body, self.bucket_name, key, ExtraArgs={"ServerSideEncryption": "AES256"}, Config=self.TRANSFER_CONFIG)
+            return
+
+        params = {"Bucket": self.bucket_name, "Key": key, "Body": body, "ServerSideEncryption": "AES256"}
+        content_md5 = object.content_md5()
+        if content_md5:
+            params["ContentMD5"] = content_md5
+        self.s3.put_object(**params)
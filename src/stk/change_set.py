@@ -19,9 +19,10 @@ class ChangeSet:
         self.name = name
         self.cfn = stack.cfn
 
-    def create(self, template: RenderedTemplate, change_set_type: str, tags: List(str), params: dict):
+    def create(self, template: RenderedTemplate, change_set_type: str, tags: List(str), params: dict, template_url: str = None):
         stack = self.stack
-        template_url = stack.bucket.upload(template).as_http()
+        if not template_url:
+            template_url = stack.bucket.upload(template).as_http()
 
         parameters = []
         for key, value in params.items():
@@ -12,21 +12,19 @@ import os
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from sys import exc_info
 from typing import Union
 
 import git
 
 from jinja2 import Environment, StrictUndefined
 from rich.table import Table
-from yaml import safe_load
 
 from . import ConfigException, log, console, VERSION
 from .config_file import ConfigFiles, ConfigFile
 from .template_source import TemplateSource
 from .aws_config import AwsSettings
 from .stack_refs import StackRefs
-from .interpolated_dict import InterpolatedDict, InterpolationError
+from .interpolated_dict import InterpolatedDict, InterpolationError, parse_value
 
 class Config:
     """
@@ -104,14 +102,14 @@ class Config:
                         if type(value) in [bool, dict, list, str]:
                             tpl = env.from_string(str(value))  # convert value to jinja2 template
                             result = str(tpl.render(self))
-                            self[key] = safe_load(result)
+                            self[key] = parse_value(result)
                             # print(f"expanding {key}, {value}({type(value)}) -> {self[key]}({type(self[key])})")
                         else:
                             # print(f"skipping {key}, type={type(value)}")
                             self[key] = value  # Don't try and process this value as Jinja template
                         del vars[key]
-                    except Exception:
-                        errors[key] = InterpolationError(key, value, exc_info()[1])
+                    except Exception as ex:
+                        errors[key] = InterpolationError(key, value, ex)
 
             return errors
 
@@ -169,7 +167,7 @@ class Config:
         self.config_path = config_path
 
         try:
-            cfg = ConfigFile(filename=name, config_dir=self.config_path)
+            cfg = ConfigFile.load(filename=name, config_dir=self.config_path)
             log.debug("loaded initial config file %s from %s: %s", name, self.config_path, cfg, extra={"cfg": cfg})
         except FileNotFoundError as err:
             raise Exception(f"Configuration file {name} not found in {config_path}: {err}") from err
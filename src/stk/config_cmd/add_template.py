@@ -1,16 +1,16 @@
 
 import difflib
 import os
-import pathlib
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Tuple, Union
 from dataclasses import dataclass
 
 import yaml
 from rich.prompt import Prompt
 
-from .. import clog, console
+from .. import clog, console, SafeLoader
 from ..provider import GitProvider
+from ..yaml_emitter import dump_config
 
 
 @dataclass
@@ -28,6 +28,13 @@ class RemoteFile:
         """
         return { "root": self.provider.root or "/", "version": self.provider.git_ref, "repo": self.provider.git_url }
 
+    def template_key(self) -> tuple:
+        """
+        returns (root, version, repo) of template location, for cheap comparison against the
+        default template location.
+        """
+        return (self.provider.root or "/", self.provider.git_ref, self.provider.git_url)
+
 class AddTemplateCmd:
     """
     Fetch information about template from remote repository and add configuration
@@ -40,9 +47,13 @@ class AddTemplateCmd:
         #
         self.config_dir = config_dir
 
+        # Parsed includes/common.yml, loaded on first use by _common()
+        self._common_config = None
+
         self.providers = []
 
         default = self._common("template")
+        self._default_template_key = (default.get("root"), default.get("version"), default.get("repo"))
         self.providers.append(
             GitProvider(
                     "upstream",
@@ -66,41 +77,46 @@ class AddTemplateCmd:
         provider_urls = [provider.git_url for provider in self.providers]
         clog(f"Using { ', '.join(provider_urls) } for remote template source")
 
-    def add(self, name: str, follow_refs: bool = True, inline: bool = False, local_template_dir: str = "templates") -> None:
+    def add(self, name: str, follow_refs: bool = True, inline: bool = False, local_template_dir: str = "templates", seen: Union[set, None] = None) -> None:
         """
         Generate local configuration for remote template
 
         follow_refs: if true, will attempt to add referenced stacks (if they don't exist)
+        seen: names of templates already added while following refs, so shared refs are only added once
         """
+        if seen is None:
+            seen = set()
+        if name in seen:
+            return
+        seen.add(name)
+
         template_filename = name + ".yaml"
 
-        # Load remote template
+        # Load meta-data associated with remote template
+        #  file in template repository with _ prefix
+        metadata_filename = "_" + template_filename
+
+        # Load remote template (and metadata, if it exists)
         try:
-            template = self.remote_content(template_filename)
+            template, template_metadata = self.remote_template(template_filename, metadata_filename)
         except FileNotFoundError:
             # Refs use underscore (since yaml doesn't like hyphens in keys), but have been using hyphens
             # in stack names. Bit of a hack here :-/
             kebab_name = name.replace('_', '-')
             if kebab_name != name:
                 clog(f"{template_filename}.yaml not found in remote repository, trying kebab-case version")
-                self.add(kebab_name, follow_refs=follow_refs, inline=inline, local_template_dir=local_template_dir)
+                self.add(kebab_name, follow_refs=follow_refs, inline=inline, local_template_dir=local_template_dir, seen=seen)
                 return
             clog(f"{template_filename} not found in remote repository. Aborting")
             exit(-1)
 
-        # Load meta-data associated with remote template
-        #  file in template repository with _ prefix
-        metadata_filename = "_" + template_filename
-
         metadata: Dict[str, Any] = {"config": {}}
-        try:
-            # Try to find metadata - only in the same provider, don't search self.providers
-            template_metadata = self.remote_content(metadata_filename, provider=template.provider)
-            metadata = dict(yaml.safe_load(template_metadata.content))
+        if template_metadata:
+            metadata = dict(yaml.load(template_metadata.content, Loader=SafeLoader))
             # generate configuration file first (to avoid potential looks with auto-add)
             if metadata["config"] is None:
                 metadata["config"] = {}
-        except FileNotFoundError:
+        else:
             clog(f"{metadata_filename} does not exist in remote repository - guessing defaults")
 
         # Build config object for this stack
@@ -119,7 +135,7 @@ class AddTemplateCmd:
             self.write_local_file(local_template_dir, template_filename, content=template.content)
         else:
             # If template comes from repo that is not the default, override it in the config
-            if template.template_config() != self._common()["template"]:
+            if template.template_key() != self._default_template_key:
                 config["template"] = template.template_config()
 
         # Wrote configuration file
@@ -129,9 +145,7 @@ class AddTemplateCmd:
             description = ["# " + line for line in metadata["description"].splitlines(keepends=True)]
             content += description  # type: ignore
 
-        content += [
-            yaml.safe_dump(config, default_flow_style=False, explicit_start=True, sort_keys=False)
-        ]
+        content += [dump_config(config)]
 
         self.write_local_file(name + ".yml", content="".join(content))
 
@@ -142,7 +156,7 @@ class AddTemplateCmd:
                 if self.is_local_file(ref + ".yml") or self.is_local_file(ref + ".yaml"):
                     clog(f"skipping {ref} - config exists already")
                 else:
-                    self.add(ref, local_template_dir=local_template_dir)
+                    self.add(ref, local_template_dir=local_template_dir, seen=seen)
 
 
     def is_local_file(self, *p) -> bool:
@@ -168,6 +182,22 @@ class AddTemplateCmd:
 
         raise FileNotFoundError(f"unable to find {os.path.join(*p)} in any remotes")
 
+    def remote_template(self, template_filename: str, metadata_filename: str) -> Tuple[RemoteFile, Union[RemoteFile, None]]:
+        """
+        Returns content of remote template, and it's metadata file (or None if it doesn't exist). Metadata
+        is only looked for in the same provider as the template, both are probed for in a single lookup.
+        """
+        for provider in self.providers:
+            present = provider.batch_exists([template_filename, metadata_filename])
+            if template_filename in present:
+                template = RemoteFile(str(provider.content(template_filename), encoding="utf-8"), provider)
+                metadata = None
+                if metadata_filename in present:
+                    metadata = RemoteFile(str(provider.content(metadata_filename), encoding="utf-8"), provider)
+                return template, metadata
+
+        raise FileNotFoundError(f"unable to find {template_filename} in any remotes")
+
     def local_content(self, *p) -> str:
         """
         Create local file (only if it doesn't exist)
@@ -181,7 +211,7 @@ class AddTemplateCmd:
         Create local file (only if it doesn't exist)
         """
         local_file = os.path.join(self.config_dir, *p)
-        pathlib.Path(local_file).parents[0].mkdir(parents=True, exist_ok=True)
+        os.makedirs(os.path.dirname(local_file) or ".", exist_ok=True)
         try:
             with open(local_file, "x", encoding="utf-8") as out:
                 out.write(content)
@@ -223,7 +253,14 @@ class AddTemplateCmd:
         return self._common()["core"]["environments"]
 
     def _common(self, *keys):
-        config = yaml.safe_load(self.local_content("includes/common.yml"))
+        """
+        Returns (optionally nested) value from includes/common.yml. The file is only
+        parsed once per command, it is consulted several times for each added template.
+        """
+        if self._common_config is None:
+            self._common_config = yaml.load(self.local_content("includes/common.yml"), Loader=SafeLoader) or {}
+
+        config = self._common_config
         for key in keys:
             config = config.get(key, {})
         return config
@@ -2,17 +2,21 @@ import os
 import random
 import sys
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List
+from typing import TYPE_CHECKING, List
 
-import boto3
-import inquirer
-import yaml
-import botocore
+from .. import clog
+from ..yaml_emitter import dump_config
 
-from git.repo import Repo
+# boto3, inquirer and git are slow to import, and only needed when actually running
+# `config init`, so they are imported where used.
+if TYPE_CHECKING:
+    from git.repo import Repo
 
-from .. import clog
+
+# Max concurrent S3 GetBucketLocation requests when listing buckets
+BUCKET_LOCATION_WORKERS = 16
 
 
 class InitCmd:
@@ -27,7 +31,7 @@ class InitCmd:
     def __init__(self, directory) -> None:
         self.config = {}
         self.directory = directory
-        self.repo: Repo
+        self.repo: "Repo"
 
     def new(self, **kwargs):
         """
@@ -83,17 +87,8 @@ class InitCmd:
         #         "root": '{{ environ["TEMPLATE_PATH"] }}',
         #     }
 
-        yaml.SafeDumper.add_representer(
-            type(None),
-            lambda x, value: x.represent_scalar("tag:yaml.org,2002:null", "")
-        )
-
         self.config = {
-            "includes/common.yml": yaml.safe_dump(
-                common_config,
-                default_flow_style=False,
-                explicit_start=True, sort_keys=False
-            ),
+            "includes/common.yml": dump_config(common_config),
             ".gitignore": "*.log\n.template-cache\n"
         }
 
@@ -102,6 +97,8 @@ class InitCmd:
         os.mkdir(self.directory)
 
     def _git_init(self):
+        from git.repo import Repo
+
         clog("initializing new git repository")
         self.repo = Repo.init(self.directory)
 
@@ -109,9 +106,7 @@ class InitCmd:
         clog("writing configuration files")
         for filename, content in self.config.items():
             full_path = os.path.join(self.directory, filename)
-            dir_name = os.path.dirname(full_path)
-            if not os.path.exists(dir_name):
-                os.mkdir(dir_name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
 
             with open(full_path, "x", encoding="utf-8") as fh:
                 fh.write(content)
@@ -136,6 +131,8 @@ class InitCmd:
             """
             Handle process of collecting AWS settings - profile, region and CFN bucket
             """
+            import inquirer
+
             questions = []
 
             self._gather_profile(questions)
@@ -157,6 +154,9 @@ class InitCmd:
             return aws_settings
 
         def _gather_profile(self, questions: List):
+            import boto3
+            import inquirer
+
             session = boto3.session.Session()
             if not self.profile:
                 profiles = session.available_profiles
@@ -180,6 +180,9 @@ class InitCmd:
                     )
 
         def _gather_region(self, questions: List):
+            import boto3
+            import inquirer
+
             session = boto3.session.Session()
             if self.region is None:
                 regions = sorted(session.get_available_regions("ec2"))
@@ -193,6 +196,10 @@ class InitCmd:
                 )
 
         def _gather_bucket(self, region: str, profile: str):
+            import boto3
+            import botocore.exceptions
+            import inquirer
+
             # Now that we have profile/region - we can figure out what bucket to use
             if not self.bucket_name:
                 session = boto3.session.Session(
@@ -202,11 +209,17 @@ class InitCmd:
                     s3_client = session.client("s3")
                     create_option = "NONE - create a new bucket"
 
+                    def bucket_location(name):
+                        return name, s3_client.get_bucket_location(Bucket=name)['LocationConstraint']
+
+                    # One request per bucket, so look them up concurrently
+                    bucket_names = [bucket['Name'] for bucket in s3_client.list_buckets()["Buckets"]]
+                    with ThreadPoolExecutor(max_workers=BUCKET_LOCATION_WORKERS) as executor:
+                        locations = list(executor.map(bucket_location, bucket_names))
+
                     buckets = [create_option]
-                    for bucket_name in s3_client.list_buckets()["Buckets"]:
-                        name = bucket_name['Name']
-                        location = s3_client.get_bucket_location(Bucket=name)
-                        if (region == 'us-east-1' and location['LocationConstraint'] == None) or location['LocationConstraint'] == region:
+                    for name, location in locations:
+                        if (region == 'us-east-1' and location == None) or location == region:
                             buckets.append(name)
 
                     bucket_answer = inquirer.prompt([
@@ -258,6 +271,8 @@ class InitCmd:
         """
         Allow user to specify what environment's to deploy
         """
+        import inquirer
+
         answers = inquirer.prompt(
             [
                 inquirer.Checkbox(
@@ -1,40 +1,144 @@
 from __future__ import annotations
+
+import os
+
+from os import path
 from pathlib import Path
-from typing import Union
+from typing import Any, Dict, Tuple, Union
 
 import yaml
 
 
-from . import log
+from . import log, SafeLoader
+
+
+# Parsed YAML documents, keyed by (absolute path, mtime, size)
+_PARSE_CACHE: Dict[Tuple[str, int, int], Any] = {}
+
+
+def _parse_yaml_file(filepath: Union[str, Path]) -> Any:
+    """
+    Parse a YAML file, re-using the parsed result from earlier in this process if the file has the
+    same mtime/size.
+
+    Returns a shallow copy of cached mappings, so callers can replace top-level keys.
+    """
+    st = os.stat(filepath)
+    identity = (path.abspath(filepath), st.st_mtime_ns, st.st_size)
+
+    if identity not in _PARSE_CACHE:
+        _PARSE_CACHE[identity] = _load_yaml_file(filepath)
+
+    parsed = _PARSE_CACHE[identity]
+    return dict(parsed) if isinstance(parsed, dict) else parsed
+
+
+def _load_yaml_file(filepath: Union[str, Path]) -> Any:
+    # The loader is given bytes rather than a text stream so libyaml can decode it directly rather
+    # than pulling chunks through the python io layer.
+    with open(filepath, "rb") as fh:
+        return yaml.load(fh.read(), Loader=SafeLoader)
+
+
+# Config files in each directory, keyed by (config dir, directory relative to it). Each entry is
+# (directory mtime, {name without extension => file name}). Adding or removing a file changes the
+# directory's mtime, so a stale listing is detected with a single stat() rather than a re-scan.
+_RESOLVE_CACHE: Dict[Tuple[str, str], Tuple[Union[int, None], Dict[str, str]]] = {}
+
+
+def _find_config_file(config_dir: str, p: Path) -> Path:
+    """
+    Returns path (relative to config_dir) of config file `p`, trying .yaml then .yml extensions if
+    `p` doesn't have an extension.
+    """
+    if p.suffix:
+        return p
+
+    dir_path = Path(config_dir, p.parent)
+    cache_key = (config_dir, str(p.parent))
+    try:
+        mtime = os.stat(dir_path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    cached = _RESOLVE_CACHE.get(cache_key)
+    if cached is None or cached[0] != mtime:
+        # A single directory listing resolves `p` and any sibling config files (most directories
+        # hold several) which are likely to be looked up next.
+        config_files: Dict[str, str] = {}
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    stem, suffix = path.splitext(entry.name)
+                    # .yaml takes precedence over .yml
+                    if suffix == ".yaml" or (suffix == ".yml" and stem not in config_files):
+                        config_files[stem] = entry.name
+        except FileNotFoundError:
+            pass
+        cached = _RESOLVE_CACHE[cache_key] = (mtime, config_files)
+
+    name = cached[1].get(p.name)
+    if name:
+        return p.parent / name
+
+    raise FileNotFoundError(f"{p} does not exist (tried .yaml,.yml)")
+
+
+# ConfigFile instances loaded in this process, keyed by (config dir, config file, mtime)
+_CONFIG_FILE_CACHE: Dict[Tuple[str, str, int], ConfigFile] = {}
 
 
 class ConfigFiles(list):
-    def fetch_dict(self, key, environment, defaults: dict = {}):
-        ret_val = dict(defaults)
+    def __init__(self, *args):
+        super().__init__(*args)
+        # {environment => (config objects the layers were built from, layers)}
+        self._layer_cache: Dict[str, Tuple[tuple, Dict[str, list]]] = {}
 
-        for config_file in self:
-            # Top-level key in file is lowest priority
-            try:
-                ret_val.update(config_file.get(key, {}))
-            except TypeError as ex:
-                self.report_error(f"Unable to retrieve top-level key '{key}'", config_file, key, ex)
+    def __copy__(self):
+        return ConfigFiles(self)
+
+    def layers(self, environment) -> Dict[str, list]:
+        """
+        Returns {key => [(config_object, is_environment_specific, value), ...]} for every key defined in
+        config objects, lowest precedence first. Within each config object the top-level key is lower
+        priority than the environment-specific key.
 
-            # Environment-specific key is higher priority
+        Built in a single pass over config objects, and cached per environment. The cache is only
+        used while the list still holds the same config objects, so it can't go stale however the
+        list is modified.
+        """
+        config_objects = tuple(self)
+        cached = self._layer_cache.get(environment)
+        if cached is not None and len(cached[0]) == len(config_objects) and all(a is b for a, b in zip(cached[0], config_objects)):
+            return cached[1]
+
+        layers: Dict[str, list] = {}
+        for config_object in config_objects:
+            for key, value in config_object.items():
+                layers.setdefault(key, []).append((config_object, False, value))
+            for key, value in config_object.environment(environment).items():
+                layers.setdefault(key, []).append((config_object, True, value))
+        self._layer_cache[environment] = (config_objects, layers)
+        return layers
+
+    def fetch_dict(self, key, environment, defaults: Union[dict, None] = None):
+        # Note: merged with successive update() calls rather than a ChainMap so resulting key order
+        # is the order keys are first defined (e.g. tags are listed in the order they're configured)
+        ret_val = dict(defaults) if defaults else {}
+
+        for config_file, is_environment_specific, value in self.layers(environment).get(key, ()):
             try:
-                ret_val.update(config_file.environment(environment).get(key, {}))
+                ret_val.update(value)
             except TypeError as ex:
-                self.report_error(f"Unable to retrieve {key} from environments.{environment}", config_file, key, ex)
+                if is_environment_specific:
+                    self.report_error(f"Unable to retrieve {key} from environments.{environment}", config_file, key, ex)
+                else:
+                    self.report_error(f"Unable to retrieve top-level key '{key}'", config_file, key, ex)
 
         return ret_val
 
-    def fetch_set(self, key, environment, defaults: list = []):
-        ret_val = set(defaults)
-
-        for config_file in self:
-            ret_val.update(config_file.get(key, []))
-            ret_val.update(config_file.environment(environment).get(key, []))
-
-        return ret_val
+    def fetch_set(self, key, environment, defaults: Union[list, None] = None):
+        return set(defaults or ()).union(*(value for _, _, value in self.layers(environment).get(key, ())))
 
     def validate(self, config):
         valid_environments = config.core.environments
@@ -46,38 +150,37 @@ class ConfigFiles(list):
         print(msg + f" while processing {config_file.filename}: {err}")
         exit(-1)
 
+
 class ConfigObject(dict):
     """Base object representing a source of configuration - multiple ConfigObjects are merged to generate final configuration by ConfigFiles"""
-    EXPECTED_KEYS = set(["aws", "core", "environments", "helpers", "includes", "params", "refs", "tags", "template", "vars"])
+    EXPECTED_KEYS = frozenset(["aws", "core", "environments", "helpers", "includes", "params", "refs", "tags", "template", "vars"])
 
     # almost all keys can appear under 'environments:'... except environments
-    EXPECTED_ENV_KEYS = EXPECTED_KEYS - set(['environments'])
+    EXPECTED_ENV_KEYS = EXPECTED_KEYS - frozenset(['environments'])
+
+    # Empty value for sections that are not defined (or explicitly null) in config
+    SECTION_DEFAULTS = {"vars": dict, "params": dict, "includes": list, "helpers": list, "environments": dict, "refs": dict, "template": dict, "tags": dict}
 
     def __init__(self):
         super().__init__()
         self.filename = "anonymous"
-        self["vars"] = {}
-        self["params"] = {}
-        self["includes"] = []
-        self["helpers"] = []
-        self["environments"] = {}
-        self["refs"] = {}
-        self["template"] = {}
-        self["tags"] = {}
 
+        # Memoized results of environments()/environment(); config objects aren't modified once loaded
+        self._environments = None
+        self._environment_cache = {}
 
     def _ensure_valid_keys(self):
         """
         Ensure config file only contains expected keys
         """
-        unknown_keys = set(self.keys()) - self.EXPECTED_KEYS
+        unknown_keys = self.keys() - self.EXPECTED_KEYS
 
         if unknown_keys:
             raise Exception(f"Config file {self.filename} has unexpected keys: {unknown_keys}")
 
         for env_name, env_settings in self["environments"].items():
             if env_settings:  # handle case with blank environment
-                unknown_env_keys = set(env_settings.keys()) - self.EXPECTED_ENV_KEYS
+                unknown_env_keys = env_settings.keys() - self.EXPECTED_ENV_KEYS
                 if unknown_env_keys:
                     raise Exception(f"Config file {self.filename} environments.{env_name} has unexpected keys: {unknown_env_keys}")
 
@@ -87,13 +190,17 @@ class ConfigObject(dict):
         special in that it defines which environments a stack can be deployed into - even if the
         included configs defined additional environments.
         """
-        return list(self["environments"].keys())
+        if self._environments is None:
+            self._environments = list(self["environments"].keys())
+        return self._environments
 
     def environment(self, environment) -> dict:
         """
         Returns environment section from a config file. Returns empty dict if not defined, or None.
         """
-        return self["environments"].get(environment, None) or {}
+        if environment not in self._environment_cache:
+            self._environment_cache[environment] = self["environments"].get(environment, None) or {}
+        return self._environment_cache[environment]
 
     def validate(self, valid_environments):
         if "environments" in self:
@@ -113,9 +220,13 @@ class ConfigObject(dict):
             log.debug("ConfigObject: initializing from %s", cfg)
             self.update(cfg)
 
+        for section, default in self.SECTION_DEFAULTS.items():
+            if self.get(section) is None:
+                self[section] = default()
+
         # check that an environment matching one of the reserved keys isn't defined - highly
         # likely that user has fat-fingered their config
-        reserved_env_errors = self.EXPECTED_KEYS & set(self["environments"].keys())
+        reserved_env_errors = self["environments"].keys() & self.EXPECTED_KEYS
         if reserved_env_errors:
             raise Exception(f"{self.filename} has defined environments {reserved_env_errors}; these are reserved")
 
@@ -131,14 +242,30 @@ class ConfigDocument(ConfigObject):
 
 class ConfigFile(ConfigObject):
     """A ConfigObject loaded from file (in the config dir)"""
+    @classmethod
+    def load(cls, filename: str, config_dir: str) -> ConfigFile:
+        """
+        Returns ConfigFile for `filename`, re-using an instance previously loaded by this process if the
+        file hasn't been modified since. Instances are shared, so they must be treated as read-only.
+        """
+        filepath = path.abspath(Path(config_dir, _find_config_file(config_dir, Path(filename))))
+        cache_key = (path.abspath(config_dir), filepath, os.stat(filepath).st_mtime_ns)
+
+        config_file = _CONFIG_FILE_CACHE.get(cache_key)
+        if config_file is None:
+            config_file = _CONFIG_FILE_CACHE[cache_key] = cls(filename, config_dir)
+        return config_file
+
     def __init__(self, filename: str, config_dir: str):
         super().__init__()
         self.config_dir = config_dir
+        self._include_paths = None
+        self._include_keys = None
         self.filename = str(self._find_config_file(Path(filename)))
 
         filepath = Path(config_dir, self.filename)
         try:
-            cfg = yaml.safe_load(open(filepath, "r", encoding="utf-8")) or dict()
+            cfg = _parse_yaml_file(filepath) or dict()
         except yaml.parser.ParserError as ex:
             log.fatal("Unable to load configuration file %s", filepath, exc_info=ex)
             raise
@@ -150,6 +277,9 @@ class ConfigFile(ConfigObject):
         Returns list of included files (relative to config dir). Files will be given .yml extension
         if they don't have an extension already
         """
+        if self._include_paths is not None:
+            return self._include_paths
+
         includes = self["includes"]
         if not isinstance(includes, list):
             raise Exception(f"{self.filename} invalid `includes` directive. Expect a list, got a {type(includes)}")
@@ -159,42 +289,42 @@ class ConfigFile(ConfigObject):
         for included in includes:
             p = self._find_config_file(Path("includes", included))
             include_paths.append(str(p))
+
+        self._include_paths = include_paths
         return include_paths
 
+    def _includes_with_keys(self) -> list:
+        """
+        Returns (include, canonical path) for each of includes(). The canonical path is used so the
+        same file reached via different relative paths (or symlinks) is only loaded once.
+        """
+        if self._include_keys is None:
+            self._include_keys = [(p, path.realpath(path.join(self.config_dir, p))) for p in self.includes()]
+        return self._include_keys
 
     def load_includes(self, overrides: Union[ConfigFiles, None] = None) -> ConfigFiles:
         """
         Returns list of config objects with highest precedence last (lowest first)
         """
-        config_objects = ConfigFiles([include for include in self._load_includes(seen = set()) if include])
+        config_objects = ConfigFiles([include for include in self._load_includes(seen=set(), out=[]) if include])
         if overrides:
             config_objects.extend(overrides)
         return config_objects
 
-    def _load_includes(self, seen) -> list:
+    def _load_includes(self, seen: set, out: list) -> list:
         """
-        Recursive loading of includes. Returns a list with lowest-precedence first.
+        Recursive loading of includes. Appends to (and returns) `out`, with lowest-precedence first.
 
         E.g. if A includes B, and B includes C then a._load_includes() returns [C, B, A]
         """
-        includes = []
-        for include in self.includes():
-            if include not in seen:
-                seen.add(include)
-                included = ConfigFile(include, self.config_dir)._load_includes(seen)
-                includes += included
+        for include, key in self._includes_with_keys():
+            if key not in seen:
+                seen.add(key)
+                ConfigFile.load(include, self.config_dir)._load_includes(seen, out)
 
-        includes += [self]
+        out.append(self)
 
-        return includes
+        return out
 
     def _find_config_file(self, p: Path):
-        if p.suffix:
-            return p
-
-        for suffix in [".yaml", ".yml"]:
-            p = p.with_suffix(suffix)
-            if Path(self.config_dir, p).exists():
-                return p
-
-        raise FileNotFoundError(f"{p.with_suffix('')} does not exist (tried .yaml,.yml)")
+        return _find_config_file(self.config_dir, p)
@@ -1,7 +1,47 @@
+import re
+
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict
 from jinja2 import Environment, StrictUndefined
-from yaml import safe_load
+from yaml import load
+
+from . import SafeLoader
+
+# Shared environment used for interpolating values; constructing an environment (and loading
+# extensions) for each dict is relatively expensive.
+_env = Environment(undefined=StrictUndefined, extensions=["jinja2_strcase.StrcaseExtension"])
+
+
+# Strings that YAML loads as the same string (words without YAML-significant characters, separated
+# by single spaces), so don't need to be parsed. Excluding the keywords YAML resolves to bool/null.
+_PLAIN_STRING = re.compile(r"[A-Za-z_][\w./-]*(?: [\w./-]+)*").fullmatch
+_YAML_KEYWORDS = frozenset(
+    ["null", "Null", "NULL", "true", "True", "TRUE", "false", "False", "FALSE", "yes", "Yes", "YES", "no", "No", "NO", "on", "On", "ON", "off", "Off", "OFF"]
+)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str):
+    """
+    Returns compiled template for `source`. Environment.from_string() bypasses Jinja's template
+    cache, and the same value text (e.g. "{{ environment }}") recurs across config files, so
+    compiled templates are memoized here.
+    """
+    return _env.from_string(source)
+
+
+def is_template(value: str) -> bool:
+    """Returns true if string contains Jinja2 syntax, i.e. needs to be rendered"""
+    return "{{" in value or "{%" in value or "{#" in value
+
+
+def parse_value(value: str) -> Any:
+    """Parse (rendered) string value as YAML, skipping the parser for plain strings"""
+    if _PLAIN_STRING(value) and value not in _YAML_KEYWORDS:
+        return value
+    return load(value, Loader=SafeLoader)
+
 
 class InterpolatedDict(dict):
     def __init__(self, object: Dict[str, Any], vars: Dict[str, Any]):
@@ -13,15 +53,15 @@ class InterpolatedDict(dict):
         if type(object) != dict:
             raise Exception(object)
 
-        env = Environment(undefined=StrictUndefined, extensions=["jinja2_strcase.StrcaseExtension"])
-
         for key, value in object.items():
             try:
                 if value == None:
                     self[key] = None
                 else:
-                    value = env.from_string(str(value)).render(vars)
-                    parsed_value = safe_load(value)
+                    value = str(value)
+                    if is_template(value):
+                        value = compile_template(value).render(vars)
+                    parsed_value = parse_value(value)
                     if parsed_value != None:
                         self[key] = parsed_value
             except Exception as ex:
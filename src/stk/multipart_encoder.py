@@ -1,9 +1,10 @@
 import codecs
+import re
 import uuid
-import io
 
 
 _boundary = "//"
+_boundary_line = "--" + _boundary + "\n"
 
 _content_types = {
     # Maps string prefix to mimetype
@@ -16,38 +17,40 @@ _content_types = {
     "#part-handler": "text/part-handler",
 }
 
+# Single regex matching any of the prefixes above. Longest alternatives first so, for example,
+# "#cloud-config-archive" isn't matched as "#cloud-config"
+_content_type_prefix = re.compile("|".join(re.escape(prefix) for prefix in sorted(_content_types, key=len, reverse=True))).match
+
 
 def multipart_encode(files: dict) -> str:
     """
     Given a dict of { filename => content }, returns byte array of UTF-8
     mime-encoded payload.
     """
-    out = io.StringIO()
-
-    out.write(f'Content-Type: multipart/mixed; boundary="{_boundary}"\n')
-    out.write("MIME-Version: 1.0\n\n")
+    parts = [f'Content-Type: multipart/mixed; boundary="{_boundary}"\nMIME-Version: 1.0\n\n']
 
     for filename, content in files:
-        content_type = guess_type(content.splitlines()[0])
-        out.writelines(
-            [
-                "--" + _boundary + "\n",
-                "MIME-Version: 1.0\n",
-                "Content-Type: " + content_type + '; charset="utf-8"\n',
-                'Content-Disposition: attachment; filename="' + filename + '"\n',
-                "Content-Transfer-Encoding: utf-8\n",
-                "\n",
-                *content.splitlines(keepends=True),
-                "\n\n",
-            ]
+        # Prefixes never span lines, so matching against the whole content is the same as
+        # matching the first line - without copying it out
+        content_type = guess_type(content)
+        parts.append(
+            f"{_boundary_line}"
+            "MIME-Version: 1.0\n"
+            f'Content-Type: {content_type}; charset="utf-8"\n'
+            f'Content-Disposition: attachment; filename="{filename}"\n'
+            "Content-Transfer-Encoding: utf-8\n"
+            "\n"
         )
-    out.write(f"--{_boundary}--\n")
+        parts.append(content)
+        parts.append("\n\n")
+
+    parts.append(f"--{_boundary}--\n")
 
-    return out.getvalue()
+    return "".join(parts)
 
 
 def guess_type(first_line):
-    for prefix, content_type in _content_types.items():
-        if first_line.startswith(prefix):
-            return content_type
+    match = _content_type_prefix(first_line)
+    if match:
+        return _content_types[match.group(0)]
     return "application/octet-stream"
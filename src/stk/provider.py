@@ -5,12 +5,14 @@ repository, or local filesystem.
 from __future__ import annotations
 
 import os
+import re
 import stat
 import types
 from typing import Union, cast
 import urllib
 
-from os import path, walk
+from concurrent.futures import ThreadPoolExecutor
+from os import path
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -22,8 +24,21 @@ from gitdb.exc import BadName
 
 from . import log
 
+# Repo objects opened in this process, keyed by repository path
+_REPO_CACHE: dict = {}
+
+# Remote caches fetched (or cloned) by this process. Each is only fetched once, no matter how many
+# providers reference it.
+_FETCHED_REPOS: set = set()
+
+# A full commit id can't move, so if it's already in the local cache there's nothing to fetch
+_COMMIT_SHA = re.compile(r"[0-9a-f]{40}").fullmatch
+
 
 class GenericProvider:
+    # find(stream=True) yields file content as an iterable of chunks of (up to) this size
+    CHUNK_SIZE = 64 * 1024
+
     def template(self) -> bytes:
         tpl_path = Path(self.name)
         if not tpl_path.suffix:
@@ -39,7 +54,15 @@ class GenericProvider:
     def is_dir(self, *_) -> bool:
         pass
 
-    def find(self, dir: str, ignore: function):
+    def batch_exists(self, paths: list) -> set:
+        """Returns the subset of `paths` that are files"""
+        return set(p for p in paths if self.is_file(p))
+
+    def find(self, dir: str, ignore: function, stream: bool = False):
+        """
+        Yields (path, type, content) for each file under dir. With stream=True, file content is
+        an iterable of bytes chunks, so large files needn't be read into memory all at once.
+        """
         pass
 
 
@@ -48,6 +71,15 @@ class FilesystemProvider(GenericProvider):
     name: str
     root: str
 
+    # find() reads files concurrently, in batches of READ_BATCH_SIZE (so large trees aren't held in
+    # memory all at once)
+    READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+    READ_BATCH_SIZE = 64
+
+    # With find(stream=True), files larger than this are read in chunks as they're consumed,
+    # rather than up front
+    STREAM_THRESHOLD = 1024 * 1024
+
     def __post_init__(self):
         # Provider needs to work with absolute paths; $CWD is changed during
         # various processing changes, so specifying relative template path
@@ -62,7 +94,12 @@ class FilesystemProvider(GenericProvider):
         return None
 
     def content(self, file_path: str) -> bytes:
-        return open(path.join(self.root, file_path), "rb").read()
+        with open(path.join(self.root, file_path), "rb") as fh:
+            return fh.read()
+
+    def chunks(self, file_path: str):
+        with open(path.join(self.root, file_path), "rb") as fh:
+            yield from iter(lambda: fh.read(self.CHUNK_SIZE), b"")
 
     def is_file(self, *p) -> bool:
         return path.isfile(path.join(self.root, *p))
@@ -70,7 +107,7 @@ class FilesystemProvider(GenericProvider):
     def is_tree(self, *p) -> bool:
         return path.isdir(path.join(self.root, *p))
 
-    def find(self, dir, ignore: types.FunctionType = None):  # type: ignore
+    def find(self, dir, ignore: types.FunctionType = None, stream: bool = False):  # type: ignore
         start_dir = path.abspath(path.join(self.root, dir))
 
         if not path.exists(start_dir):
@@ -78,24 +115,39 @@ class FilesystemProvider(GenericProvider):
 
         if self.is_tree(start_dir):
             log.info("adding directory tree under %s to zip", dir)
-            for p, _, files in walk(start_dir):
-                for f in files:
-                    file_path = path.join(p, f)
-                    if ignore and ignore(file_path):
-                        log.info("Skipping %s due to ignore rule", file_path)
-                        continue
-                    # strip the directory prefix. E.g.
-                    #  'functions/<function-name>/foo.txt' -> foo.txt
-                    relative_path = file_path[len(start_dir) + 1 :]
-
-                    file_st = os.lstat(file_path)
-                    if stat.S_ISREG(file_st.st_mode):
-                        yield (relative_path, "file", self.content(file_path))
-                    elif stat.S_ISLNK(file_st.st_mode):
-                        target = os.readlink(file_path)
-                        yield (relative_path, "symlink", target)
-                    else:
-                        raise Exception("Unsupported filesystem object at " + file_path)
+            entries = []
+            for entry in self._walk(start_dir):
+                if ignore and ignore(entry.path):
+                    log.info("Skipping %s due to ignore rule", entry.path)
+                    continue
+                entries.append(entry)
+
+            with ThreadPoolExecutor(max_workers=self.READ_WORKERS) as executor:
+                for i in range(0, len(entries), self.READ_BATCH_SIZE):
+                    batch = entries[i : i + self.READ_BATCH_SIZE]
+
+                    # DirEntry caches file type from the directory scan, so no extra lstat() required
+                    regular_files = [entry for entry in batch if entry.is_file(follow_symlinks=False)]
+                    streamed = set()
+                    if stream:
+                        streamed = set(entry.path for entry in regular_files if entry.stat(follow_symlinks=False).st_size > self.STREAM_THRESHOLD)
+                    read_files = [entry.path for entry in regular_files if entry.path not in streamed]
+                    content = dict(zip(read_files, executor.map(self.content, read_files)))
+
+                    for entry in batch:
+                        # strip the directory prefix. E.g.
+                        #  'functions/<function-name>/foo.txt' -> foo.txt
+                        relative_path = entry.path[len(start_dir) + 1 :]
+
+                        if entry.path in streamed:
+                            yield (relative_path, "file", self.chunks(entry.path))
+                        elif entry.path in content:
+                            yield (relative_path, "file", (content[entry.path],) if stream else content[entry.path])
+                        elif entry.is_symlink():
+                            target = os.readlink(entry.path)
+                            yield (relative_path, "symlink", target)
+                        else:
+                            raise Exception("Unsupported filesystem object at " + entry.path)
         elif self.is_file(start_dir):
 
             relative_path = path.basename(start_dir)
@@ -107,7 +159,7 @@ class FilesystemProvider(GenericProvider):
 
             file_st = os.lstat(start_dir)
             if stat.S_ISREG(file_st.st_mode):
-                yield (relative_path, "file", self.content(start_dir))
+                yield (relative_path, "file", self.chunks(start_dir) if stream else self.content(start_dir))
             elif stat.S_ISLNK(file_st.st_mode):
                 target = os.readlink(start_dir)
                 yield (relative_path, "symlink", target)
@@ -116,6 +168,23 @@ class FilesystemProvider(GenericProvider):
         else:
             raise Exception("Unsupported filesystem object at " + start_dir)
 
+    def _walk(self, start_dir: str):
+        """
+        Yields os.DirEntry for each non-directory under start_dir, in the same order as os.walk(). As
+        with os.walk(), symlinks to directories are neither followed nor returned.
+        """
+        pending = [start_dir]
+        while pending:
+            subdirs = []
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    else:
+                        yield entry
+            pending.extend(reversed(subdirs))
+
     def __str__(self) -> str:
         return self.name
 
@@ -131,37 +200,43 @@ class GitProvider(GenericProvider):
     repo: Repo = None
 
     def __post_init__(self):
-        if self.root.endswith("/"):
-            self.root = self.root[:-1]
+        self.root = self.root.rstrip("/")
 
         log.debug(f"GitProvider(name={self.name}, url={self.git_url}, root={self.root})")
 
         if not self.git_url:
             raise Exception("template.git_url is not set")
 
-        if self.git_url.startswith(".") or self.git_url.startswith("/"):
+        if self.git_url.startswith((".", "/")):
             # Local repository (e.g. ../templates)
-            self.repo = Repo(self.git_url)
+            self.repo = self._local_repo(self.git_url)
         else:
             url = urllib.parse.urlparse(self.git_url)
             log.debug(url)
             if url.scheme == "file":  # "file" in url.protocols:
                 log.info("Local git repository at %s", url.path)
-                self.repo = Repo(url.path)
+                self.repo = self._local_repo(url.path)
             else:
                 # Remote repository
                 url = giturlparse.parse(self.git_url)
-                cache_dir = self._cache_path(url)
-                if path.exists(cache_dir):
+                cache_dir = path.abspath(self._cache_path(url))
+                if cache_dir in _REPO_CACHE or path.exists(cache_dir):
                     log.info("using existing cached version %s", cache_dir)
-                    self.repo = Repo(cache_dir)
-                    log.info("git fetch remote 'origin'")
-                    self.repo.remotes["origin"].fetch(refspec="+refs/heads/*:refs/heads/*")
+                    self.repo = self._local_repo(cache_dir)
+                    if cache_dir in _FETCHED_REPOS:
+                        log.info("%s already fetched", cache_dir)
+                    elif self._has_commit(self.git_ref):
+                        log.info("commit %s is already cached, skipping fetch", self.git_ref)
+                    else:
+                        log.info("git fetch remote 'origin'")
+                        self.repo.remotes["origin"].fetch(refspec="+refs/heads/*:refs/heads/*")
+                        _FETCHED_REPOS.add(cache_dir)
                 else:
                     log.info("don't have a cached copy of %s in %s", self.git_url, cache_dir)
                     os.makedirs(cache_dir, mode=0o700, exist_ok=True)
                     log.info("cloning from %s -> %s", self.git_url, cache_dir)
-                    self.repo = Repo.clone_from(self.git_url, cache_dir, bare=True)
+                    self.repo = _REPO_CACHE[cache_dir] = Repo.clone_from(self.git_url, cache_dir, bare=True)
+                    _FETCHED_REPOS.add(cache_dir)
 
         log.info("getting commit %s from %s", self.git_ref, self.repo)
 
@@ -176,11 +251,56 @@ class GitProvider(GenericProvider):
 
         log.info("have commit %s", self.commit.hexsha)
 
+        # The commit is fixed for the lifetime of the provider, so file lookups can be cached
+        self._content_cache = {}
+        self._is_file_cache = {}
+        # Blobs under root, by path; only built for bulk lookups (see batch_exists)
+        self._blobs = None
+
+    @staticmethod
+    def _local_repo(repo_path: str) -> Repo:
+        key = path.abspath(repo_path)
+        if key not in _REPO_CACHE:
+            _REPO_CACHE[key] = Repo(repo_path)
+        return _REPO_CACHE[key]
+
+    def _has_commit(self, git_ref: str) -> bool:
+        return bool(_COMMIT_SHA(git_ref)) and self.repo.odb.has_object(bytes.fromhex(git_ref))
+
+    def _index(self) -> dict:
+        """
+        Lists every blob under root with a single traversal, so that bulk lookups don't have to
+        walk the tree one path segment at a time for each path.
+        """
+        if self._blobs is None:
+            self._blobs = {}
+            try:
+                tree = self.commit.tree[self.root] if self.root else self.commit.tree
+            except KeyError:
+                return self._blobs
+            if tree.type == "tree":
+                for item in tree.traverse():
+                    if item.type == "blob":
+                        self._blobs[item.path] = item
+        return self._blobs
+
+    def _read(self, blob: Blob) -> bytes:
+        # Read straight from the object database, skipping GitPython's blob stream wrapper
+        return self.repo.odb.stream(blob.binsha).read()
+
+    def _chunks(self, blob: Blob):
+        stream = self.repo.odb.stream(blob.binsha)
+        yield from iter(lambda: stream.read(self.CHUNK_SIZE), b"")
+
     def content(self, *p) -> bytes:
+        if p in self._content_cache:
+            return self._content_cache[p]
+
         file_path = path.join(self.root, *p)
         try:
             log.info(f"getting content for {file_path}")
-            return self.commit.tree[file_path].data_stream.read()
+            content = self._content_cache[p] = self._read(self.commit.tree[file_path])
+            return content
         except KeyError as ex:
             log.exception(f"Git object (git={self.git_url} file_path={file_path})@{self.git_ref}: does not exist", exc_info=ex)
             raise
@@ -189,26 +309,29 @@ class GitProvider(GenericProvider):
         return self.commit
 
     def is_file(self, *p) -> bool:
-        file_path = path.join(self.root, *p)
-        try:
-            obj = self.commit.tree[file_path]
-            if obj.type == "blob":
-                return True
-            return False
-        except KeyError:
-            return False
+        if p not in self._is_file_cache:
+            file_path = path.join(self.root, *p)
+            if self._blobs is not None:
+                self._is_file_cache[p] = file_path in self._blobs
+            else:
+                try:
+                    self._is_file_cache[p] = self.commit.tree[file_path].type == "blob"
+                except KeyError:
+                    self._is_file_cache[p] = False
+        return self._is_file_cache[p]
+
+    def batch_exists(self, paths: list) -> set:
+        """Returns the subset of `paths` that are files, from a single traversal of the tree under root"""
+        blobs = self._index()
+        return set(p for p in paths if path.join(self.root, p) in blobs)
 
     def is_tree(self, *p) -> bool:
-        dir_path = path.join(self.root, *p)
         try:
-            obj = self.commit.tree[dir_path]
-            if obj.type == "tree":
-                return True
-            return False
+            return self.commit.tree[path.join(self.root, *p)].type == "tree"
         except KeyError:
             return False
 
-    def find(self, dir, ignore: types.FunctionType = None):  # type: ignore
+    def find(self, dir, ignore: types.FunctionType = None, stream: bool = False):  # type: ignore
         if dir.endswith("/"):
             dir = dir[:-1]
 
@@ -227,14 +350,14 @@ class GitProvider(GenericProvider):
                         type = "symlink"
                     else:
                         type = "file"
-                    yield (item_path, type, item.data_stream.read())
+                    yield (item_path, type, self._chunks(item) if stream else self._read(item))
         elif tree.type == "blob":
             log.info("adding single file %s to zip", tree_path)
             if tree.mode & tree.link_mode == tree.link_mode:
                 type = "symlink"
             else:
                 type = "file"
-            yield (tree_path, type, tree.data_stream.read())
+            yield (tree_path, type, self._chunks(tree) if stream else self._read(tree))
         else:
             raise Exception("Unsupported git object at " + tree_path)
 
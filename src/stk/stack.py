@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from random import choice
 from string import ascii_letters
@@ -26,6 +27,20 @@ class Stack(BasicStack):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+    def describe_stack(self):
+        """
+        Cache describe_stack between changes, so status()/exists()/outputs() checks made during a
+        single command share one DescribeStacks call. Operations that modify the stack call
+        invalidate_status().
+        """
+        if not hasattr(self, "_describe_stack_result"):
+            self._describe_stack_result = super().describe_stack()
+        return self._describe_stack_result
+
+    def invalidate_status(self):
+        """Discard cached stack description, forcing next status() to query CloudFormation"""
+        self.__dict__.pop("_describe_stack_result", None)
+
     def validate(self, template: RenderedTemplate):
         """Validate template"""
         log.warning("Validating template")
@@ -47,10 +62,22 @@ class Stack(BasicStack):
         if not change_set_name:
             change_set_name = "".join((choice(ascii_letters) for _ in range(12)))
 
-        status = self.status()
+        # Stack status and template upload are independent requests, so run them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            status_future = executor.submit(self.status)
+            template_url_future = executor.submit(lambda: self.bucket.upload(template).as_http())
+            status = status_future.result()
+            template_url = template_url_future.result()
+
         change_set_type = "UPDATE" if status and status != "REVIEW_IN_PROGRESS" else "CREATE"
 
-        return ChangeSet(self, change_set_name).create(template=template, change_set_type=change_set_type, tags=tags, params=params)
+        try:
+            return ChangeSet(self, change_set_name).create(
+                template=template, change_set_type=change_set_type, tags=tags, params=params, template_url=template_url
+            )
+        finally:
+            # A CREATE change set brings the stack into existence (REVIEW_IN_PROGRESS)
+            self.invalidate_status()
 
     def execute_change_set(self, change_set_name: str) -> bool:
         """
@@ -69,6 +96,8 @@ class Stack(BasicStack):
             return True
         except WaiterError as ex:
             print("Change set could not be applied:", ex)
+        finally:
+            self.invalidate_status()
 
     def delete_change_set(self, change_set_name: str):
         ChangeSet(self, change_set_name).delete()
@@ -77,7 +106,10 @@ class Stack(BasicStack):
         # Get list of resources before we start deleting them
         resources = self.resources()
         self.cfn.delete_stack(StackName=self.name)
-        StackWaiter(self).wait_for_stack("stack_delete_complete", resources=resources)
+        try:
+            StackWaiter(self).wait_for_stack("stack_delete_complete", resources=resources)
+        finally:
+            self.invalidate_status()
 
     def diff(self, template: RenderedTemplate) -> str:
         """
@@ -125,3 +157,5 @@ class Stack(BasicStack):
             return True
         except WaiterError as ex:
             print("Change could not be applied:", ex)
+        finally:
+            self.invalidate_status()
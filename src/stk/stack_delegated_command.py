@@ -26,6 +26,9 @@ class StackDelegatedCommand:
     overrides: str
     outputs_format: str = "table"
 
+    # Stack attributes exposed directly on the command
+    DELEGATED = ("cfn", "status", "exists", "outputs", "output", "resources", "diff", "wait", "delete", "execute_change_set", "delete_change_set")
+
     def __post_init__(self):
         overrides = parse_overrides(self.var, self.param, self.overrides)
         self.config = Config(
@@ -39,10 +42,11 @@ class StackDelegatedCommand:
                            name=self.config.core.stack_name)
         self.stack_name = self.stack.name
 
-    def __getattr__(self, name):
-        if hasattr(self.stack, name):
-            return getattr(self.stack, name)
-        return super().__getattr__(name)
+        # Bind delegated attributes once (rather than resolving them via __getattr__ on each
+        # access), without shadowing anything a subclass implements itself.
+        for name in self.DELEGATED:
+            if not hasattr(type(self), name):
+                setattr(self, name, getattr(self.stack, name))
 
     def show_outputs(self):
         """
@@ -20,6 +20,15 @@ class StackReference(BasicStack):
             self._describe_stack_result = super().describe_stack()
         return self._describe_stack_result
 
+    def outputs(self):
+        """
+        Outputs are built once from the cached describe_stack, rather than for each output()
+        lookup (templates often read many outputs of the same referenced stack).
+        """
+        if not hasattr(self, "_outputs"):
+            self._outputs = super().outputs()
+        return self._outputs
+
     def description(self):
         """
         return a description of the stack (name and region) to help user find
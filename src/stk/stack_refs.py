@@ -64,20 +64,27 @@ class StackRefs:
     DEFAULTS = {"stack_name": "{{ environment }}-{{ name }}", "optional": False}
 
     def __init__(self, stack_refs: Dict[str, Dict[str, str]], config: Any):
-        self._stacks: Union[Dict[str, OptionalStackReference], None] = None
+        # References are built on first use (see _stack_ref())
+        self._stacks: Dict[str, OptionalStackReference] = {}
         self.config = config
         self.refs = stack_refs
         log.debug("defined refs: %s", self.refs)
 
+        # Options and interpolation variables common to all references
+        region = config.aws.region
+        self._base_opts = {"region": region, **self.DEFAULTS}
+        self._base_vars = {"environment": config.environment, "region": region}
+
     def __contains__(self, name: str) -> bool:
-        return name in self.stacks()
+        # Membership only depends on config, so doesn't need stack references to be built
+        return name in self.refs and name not in self.RESERVED_KEYS
 
     def __getitem__(self, name: str) -> OptionalStackReference:
         return self.stack(name)
 
     def __getattr__(self, name: str):
-        if name in self.stacks().keys():
-            return self.stacks()[name]
+        if name in self.refs and name not in self.RESERVED_KEYS:
+            return self._stack_ref(name)
         raise StackReferenceException(f"{name} is not a known stack ref - only know about {', '.join(self.refs.keys())}")
 
     def exists(self, name: str):
@@ -103,10 +110,11 @@ class StackRefs:
         ref = self.refs[name]
         log.debug("looking up stack %s, ref=%s", name, ref)
 
-        stack = self.stacks()[name]
+        stack = self._stack_ref(name)
 
-        log.debug("stack=%s, status=%s, exists=%s", stack, stack.status(), stack.exists())
-        if stack.exists():
+        exists = stack.exists()
+        log.debug("stack=%s, exists=%s", stack, exists)
+        if exists:
             log.debug("found stack")
             return stack
 
@@ -118,58 +126,47 @@ class StackRefs:
         raise Exception(f"Referenced stack {name}, does not exist (stack name={ref['stack_name']}, region={ref.get('region', stack.aws.region)})")
 
     RESERVED_KEYS = ["environment"]
-    def stacks(self) -> Dict[str, OptionalStackReference]:
-        if self._stacks is None:
-            log.debug("START - building list of stack references")
-            # _stacks is dict of {name => OptionalStackReference() for each named stack. This includes
-            # stacks that don't exist.
-            self._stacks = {}
-            for name, cfg in self.refs.items():
-                log.debug("processing name=%s: config=%s", name, cfg)
-                if name in self.RESERVED_KEYS:
-                    log.debug("skipping %s, reserved key", name)
-                    continue
-
-                if not cfg:
-                    cfg = {}
-
-                if not issubclass(type(cfg), dict):
-                    print(f"{name} is not a valid stack reference definition (from {self.refs})")
-                    exit(-1)
-
-                # Try building dict of options. This can fail if interpolating incorrect variable or
-                #try:
-                final_opts = InterpolatedDict({"region": self.config.aws.region, **self.DEFAULTS, **cfg}, {"environment": self.config.environment, "name": name.replace("_", "-"), "region": self.config.aws.region})
-                log.debug("Have built final_opts=%s", final_opts)
-                #except Exception as ex:
-                #    print(f"Unable to process settings for stack reference {name} -> {cfg} (from {self.refs})", ex)
-                #    exit(-1)
-
-                try:
-                    log.info("final ops: stack reference %s: %s", name, final_opts)
-                    opts = StackRefOpts(**final_opts)
-                except Exception as ex:
-                    log.exception("Invalid configuration for stack.refs '%s' %s: %s", name, self.refs, ex, exc_info=ex)
-                    raise
-
-                aws = self.config.aws
-                if opts.region != aws.region:
-                    log.debug("stack reference is in a different region")
-                    aws = copy(aws)
-                    aws.region = opts.region
-
-                log.debug("Storing %s as optional stack reference", name)
-                stack_ref = OptionalStackReference(name, StackReference(aws=aws, name=opts.stack_name), optional=opts.optional)
-
-                self._stacks[name] = stack_ref
-                if stack_ref.exists():
-                    try:
-                        log.info("stack %s %s has the following outputs: %s", name, stack_ref.description(), stack_ref.outputs())
-                    except Exception as ex:
-                        log.exception("unable to get outputs for stack %s", name)
-                        raise ex
-                else:
-                    log.info("stack %s %s doesn't exist", name, stack_ref.description())
-            log.debug("DONE - building list of stack references")
-
-        return self._stacks
+    def _stack_ref(self, name: str) -> OptionalStackReference:
+        """
+        Returns OptionalStackReference for a single named reference, building it on first use. The
+        referenced stack isn't described until it's actually needed.
+        """
+        if name in self._stacks:
+            return self._stacks[name]
+
+        cfg = self.refs[name]
+        log.debug("processing name=%s: config=%s", name, cfg)
+        if name in self.RESERVED_KEYS:
+            raise KeyError(name)
+
+        if not cfg:
+            cfg = {}
+
+        if not issubclass(type(cfg), dict):
+            print(f"{name} is not a valid stack reference definition (from {self.refs})")
+            exit(-1)
+
+        # Try building dict of options. This can fail if interpolating incorrect variable or
+        #try:
+        final_opts = InterpolatedDict({**self._base_opts, **cfg}, {**self._base_vars, "name": name.replace("_", "-")})
+        log.debug("Have built final_opts=%s", final_opts)
+        #except Exception as ex:
+        #    print(f"Unable to process settings for stack reference {name} -> {cfg} (from {self.refs})", ex)
+        #    exit(-1)
+
+        try:
+            log.info("final ops: stack reference %s: %s", name, final_opts)
+            opts = StackRefOpts(**final_opts)
+        except Exception as ex:
+            log.exception("Invalid configuration for stack.refs '%s' %s: %s", name, self.refs, ex, exc_info=ex)
+            raise
+
+        aws = self.config.aws
+        if opts.region != aws.region:
+            log.debug("stack reference is in a different region")
+            aws = copy(aws)
+            aws.region = opts.region
+
+        log.debug("Storing %s as optional stack reference", name)
+        self._stacks[name] = OptionalStackReference(name, StackReference(aws=aws, name=opts.stack_name), optional=opts.optional)
+        return self._stacks[name]
@@ -1,18 +1,40 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from time import sleep
-from botocore.exceptions import ClientError
+from random import uniform
+from time import monotonic, sleep
+from botocore.exceptions import ClientError, WaiterError
 
 from rich import box
 from rich.table import Table
-from rich.live import Live
 
 from . import console
 
 class StackWaiter:
+    # Polling starts with a short delay (change sets are usually ready within a few seconds), backing
+    # off exponentially (with jitter) for slower operations. Stack polls are capped lower than change
+    # sets since each one also refreshes the event table. Both time out after an hour.
+    CHANGE_SET_INITIAL_DELAY = 1
+    CHANGE_SET_MAX_DELAY = 15
+    STACK_INITIAL_DELAY = 2
+    STACK_MAX_DELAY = 10
+    BACKOFF = 1.5
+    TIMEOUT = 3600
+
+    # Error codes that cause an extra backoff step, rather than failing the wait
+    THROTTLING_CODES = ("Throttling", "ThrottlingException", "RequestLimitExceeded")
+
+    # Number of processed event ids remembered. Only the most recent matter, since fetching events
+    # stops at the first already-seen one (events are newest first).
+    MAX_SEEN_EVENTS = 10000
+
     def __init__(self, stack):
         self.stack = stack
         self.cfn = stack.cfn
-        self.seen_events = set()
+        self.seen_events = OrderedDict()
+        # Resource names in display order. Resources are only ever added, so this just needs
+        # rebuilding when the number of resources changes.
+        self.sorted_names = []
         self.start_time = datetime.now(timezone.utc)
 
     class ResourceEvent:
@@ -33,8 +55,10 @@ class StackWaiter:
                 self.status_reason = event.get("ResourceStatusReason", None)
                 self.timestamp = event["Timestamp"].astimezone()
 
-        def last_seen(self):
-            return "%ds ago" % (datetime.now().astimezone() - self.timestamp).seconds if self.timestamp else "-"
+        def last_seen(self, now: datetime = None):
+            if not self.timestamp:
+                return "-"
+            return "%ds ago" % ((now or datetime.now().astimezone()) - self.timestamp).seconds
 
     def wait_for_change_set(self, waiter_name, change_set):
         waiter = self.cfn.get_waiter(waiter_name)
@@ -50,7 +74,33 @@ class StackWaiter:
                 pass
 
         wrapped_waiter = self.wrap_waiter(waiter, waiter_callback)
-        wrapped_waiter.wait(WaiterConfig={"Delay": 5, "MaxAttempts": 720}, StackName=self.stack.name, ChangeSetName=change_set.name)
+        self.poll(wrapped_waiter, self.CHANGE_SET_INITIAL_DELAY, self.CHANGE_SET_MAX_DELAY, StackName=self.stack.name, ChangeSetName=change_set.name)
+
+    def poll(self, waiter, initial_delay: float, max_delay: float, **kwargs):
+        """
+        Wait until `waiter` reaches a success (returns) or failure (raises WaiterError) state.
+
+        Single-attempt waits evaluate the waiter's success/failure rules against one response; the
+        delay between attempts is managed here: exponential backoff, capped at max_delay, with
+        +/-20% jitter. Throttling responses add an extra backoff step.
+        """
+        deadline = monotonic() + self.TIMEOUT
+        attempt = 0
+        while True:
+            try:
+                waiter.wait(WaiterConfig={"Delay": 1, "MaxAttempts": 1}, **kwargs)
+                return
+            except WaiterError as ex:
+                reason = ex.kwargs.get("reason", "")
+                if monotonic() >= deadline:
+                    raise
+                if any(f"({code})" in reason for code in self.THROTTLING_CODES):
+                    attempt += 1
+                elif not reason.startswith("Max attempts exceeded"):
+                    raise
+            delay = min(max_delay, initial_delay * self.BACKOFF**attempt)
+            sleep(delay * uniform(0.8, 1.2))
+            attempt += 1
 
     def wait_for_stack(self, waiter_name, resources: dict = None):
         """
@@ -69,14 +119,23 @@ class StackWaiter:
             for name, resource_type in resources.items():
                 self.resources[name] = StackWaiter.ResourceEvent(logical_id=name, type=resource_type)
 
+        self.sorted_names = []
+
         # Wait with a live-updated table showing resources to be changed, and their current
-        # state.
+        # state. rich.live is only needed here, so isn't imported by commands that never wait.
+        from rich.live import Live
+
         try:
-            with Live(self.refresh_table(), refresh_per_second=1, transient=False, console=console) as live:
+            with Live(self.refresh_table(), refresh_per_second=1, transient=False, console=console) as live, ThreadPoolExecutor(max_workers=1) as executor:
+                # Stack events are fetched in the background while the waiter sleeps, rather than
+                # adding describe_stack_events round-trips to each poll. A slow fetch doesn't hold up
+                # polling; its events are applied on a later poll once it has completed.
+                pending = []
 
                 def waiter_callback(response):
                     # print(response)
-                    live.update(self.refresh_table())
+                    if pending and pending[0].done():
+                        self.apply_events(pending.pop().result())
                     if "Stacks" in response:
                         # Update status of stack object (pseudo-resource)
                         stacks = response["Stacks"]
@@ -84,11 +143,16 @@ class StackWaiter:
                             self.resources[self.stack.name].status = response["Stacks"][0]["StackStatus"]
                     elif "Error" in response:
                         console.log(response["Error"]["Message"])
+                    live.update(self.build_table())
+                    if not pending:
+                        pending.append(executor.submit(self.fetch_new_events))
 
                 waiter = self.wrap_waiter(waiter, waiter_callback)
-                waiter.wait(WaiterConfig={"Delay": 2, "MaxAttempts": 1800}, StackName=self.stack.name)
+                self.poll(waiter, self.STACK_INITIAL_DELAY, self.STACK_MAX_DELAY, StackName=self.stack.name)
 
                 # Perform a final update so the status table reflects end state
+                if pending:
+                    self.apply_events(pending.pop().result())
                 live.update(self.refresh_table())
         except ClientError as e:
             error_received = e.response["Error"]
@@ -98,22 +162,60 @@ class StackWaiter:
 
     def refresh_table(self):
         self.process_new_events()
+        return self.build_table()
+
+    def build_table(self):
         table = Table("Logical Resource", "Type", "Status", "Last Updated", box=box.SIMPLE)
-        for _, resource in sorted(self.resources.items()):
-            table.add_row(resource.logical_id, resource.type, resource.status, resource.last_seen())
+        if len(self.sorted_names) != len(self.resources):
+            self.sorted_names = sorted(self.resources)
+        now = datetime.now(timezone.utc)
+        for name in self.sorted_names:
+            resource = self.resources[name]
+            table.add_row(resource.logical_id, resource.type, resource.status, resource.last_seen(now))
         return table
 
     def process_new_events(self):
-        paginator = self.cfn.get_paginator("describe_stack_events")
+        self.apply_events(self.fetch_new_events())
+
+    def fetch_new_events(self) -> list:
+        """
+        Returns events not yet processed, oldest first. Doesn't modify waiter state, so can run
+        in the background while the status table is being drawn.
+        """
+        # Events are returned newest first, so stop fetching pages as soon as we reach an event
+        # we've already processed (or one from before we started waiting).
+        new_events = []
         # Use stack identifier in case stack has been deleted+*
-        for events in paginator.paginate(StackName=self.stack.name):
-            for e in events["StackEvents"]:
-                resource = self.ResourceEvent(e)
-                if resource.timestamp >= self.start_time and resource.event_id not in self.seen_events:
-                    self.resources[resource.logical_id] = resource
-                    self.seen_events.add(resource.event_id)
-                    if resource.status_reason:
-                        console.log(resource.logical_id + ": " + resource.status_reason)
+        params = {"StackName": self.stack.name}
+        while True:
+            page = self.cfn.describe_stack_events(**params)
+            for e in page["StackEvents"]:
+                # Check the raw event first; only events we're going to keep become ResourceEvents
+                if e["Timestamp"] < self.start_time or e["EventId"] in self.seen_events:
+                    break
+                new_events.append(self.ResourceEvent(e))
+            else:
+                if "NextToken" in page:
+                    params["NextToken"] = page["NextToken"]
+                    continue
+            break
+
+        new_events.reverse()
+        return new_events
+
+    def apply_events(self, new_events: list):
+        if not new_events:
+            return
+
+        # Apply oldest first, so each resource ends up with its latest status
+        self.resources.update((resource.logical_id, resource) for resource in new_events)
+        self.seen_events.update((resource.event_id, None) for resource in new_events)
+        while len(self.seen_events) > self.MAX_SEEN_EVENTS:
+            self.seen_events.popitem(last=False)
+
+        for resource in new_events:
+            if resource.status_reason:
+                console.log(resource.logical_id + ": " + resource.status_reason)
 
     def wrap_waiter(self, waiter, callback):
         orig_func = waiter._operation_method
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import hashlib
+import base64
 import re
+import yaml
 
+from traceback import walk_tb
 from typing import List, Union
 from cfn_tools import load_yaml
 from jinja2 import Environment, StrictUndefined, nodes
@@ -14,6 +16,28 @@ from .provider import GenericProvider
 from .config import Config
 from .template_helpers import TemplateHelpers
 from .cfn_bucket import CfnBucket, Uploadable
+from .util import md5
+
+# "@@{{ some expression }}@@" is the same as {{ some expression }}
+_UNQUOTE_EXPRESSION = re.compile(r'"@@(.*?)@@"')
+
+# Parse rendered templates with libyaml when available (considerably faster for large templates)
+try:
+    from yaml import CSafeLoader
+    from cfn_tools.yaml_loader import CfnYamlLoader
+
+    class _CfnCLoader(CSafeLoader):
+        """cfn_tools' loader (CloudFormation !tags, ordered mappings) on top of the libyaml parser"""
+
+    _CfnCLoader.yaml_constructors = dict(CfnYamlLoader.yaml_constructors)
+    _CfnCLoader.yaml_multi_constructors = dict(CfnYamlLoader.yaml_multi_constructors)
+    _CfnCLoader.yaml_implicit_resolvers = dict(CfnYamlLoader.yaml_implicit_resolvers)
+
+    def _load_template_yaml(content: Union[str, bytes]):
+        return yaml.load(content, Loader=_CfnCLoader)
+
+except ImportError:
+    _load_template_yaml = load_yaml
 
 
 class FailedTemplate(dict):
@@ -29,27 +53,33 @@ class FailedTemplate(dict):
         """
         Return traceback showing location in template that triggered the exception
         """
-        traceback = self.error.__traceback__
-        last_frame = traceback
-        while traceback:
-            filename = traceback.tb_frame.f_code.co_filename
-            if filename == "<template>" or filename == "<unknown>":
-                break
-            last_frame = traceback
-            traceback = traceback.tb_next
+        if not hasattr(self, "_tpl_frame"):
+            self._tpl_frame = self._template_frame()
+
+        filename, line_no = self._tpl_frame
 
         # If don't find filename == <template> then exception likely triggered by something
         # outside of template.
-        if not traceback:
-            line_no = last_frame.tb_lineno
-            filename = last_frame.tb_frame.f_code.co_filename
+        if filename not in ("<template>", "<unknown>"):
             return f"Error occurred outsite of template\n{str(self.error)}\n{filename}:{line_no}"
 
-        line_no = traceback.tb_lineno
         return f"{str(self.error)}\n{self.location} at line {line_no}:\n\n{self.source_context(line_no)}\n\n"
 
+    def _template_frame(self) -> tuple:
+        """
+        Returns (filename, line number) of the first template frame in the traceback, or of the
+        last frame if the error wasn't raised from within the template.
+        """
+        filename, line_no = None, None
+        for frame, line_no in walk_tb(self.error.__traceback__):
+            filename = frame.f_code.co_filename
+            if filename in ("<template>", "<unknown>"):
+                break
+        return filename, line_no
+
     def source_context(self, line_no: int) -> str:
-        lines = self.source.split("\n")
+        # Only split as far as the last line shown; the rest of the template is left as one string
+        lines = self.source.split("\n", line_no + self.ERROR_CONTEXT_LINES)
 
         from_line = max(1, line_no - self.ERROR_CONTEXT_LINES)
         to_line = min(len(lines), line_no + self.ERROR_CONTEXT_LINES + 1)
@@ -69,8 +99,14 @@ class RenderedTemplate(dict, Uploadable):
         self.name = name
         self.error = None  # enables if Template().render().error:...
 
-        parsed = load_yaml(content)
-        if not hasattr(parsed, "keys"):
+        # Encoded content and its digest are needed for both the S3 key and the upload itself
+        self._body = None
+        self._digest = None
+
+        # Parse the UTF-8 body (needed for the upload anyway); given a str the parser would
+        # otherwise make its own encoded copy of the whole template
+        parsed = _load_template_yaml(self.body())
+        if not isinstance(parsed, dict):
             raise Exception(f"Template result is a {type(parsed)}, expected dict")
         self.update(parsed)
 
@@ -78,10 +114,20 @@ class RenderedTemplate(dict, Uploadable):
         return self.content
 
     def md5(self) -> str:
-        return hashlib.md5(self.body()).hexdigest()
+        return self.digest().hex()
+
+    def digest(self) -> bytes:
+        if self._digest is None:
+            self._digest = md5(self.body()).digest()
+        return self._digest
+
+    def content_md5(self) -> str:
+        return base64.b64encode(self.digest()).decode("ascii")
 
     def body(self) -> bytes:
-        return self.content.encode("utf-8")
+        if self._body is None:
+            self._body = self.content.encode("utf-8")
+        return self._body
 
     def key(self) -> str:
         return "/".join(["templates", self.name, self.md5() + ".zip"])
@@ -147,26 +193,39 @@ class Template:
         self.name = name
         self.provider = provider
         self.helpers = helpers
+        self._env = None
+        # Compiled templates, keyed by template source
+        self._compiled = {}
+
+    def environment(self) -> Environment:
+        """Jinja2 environment (with helpers injected) for rendering; built on first use"""
+        if self._env is None:
+            env = Environment(line_statement_prefix="##", undefined=StrictUndefined, extensions=['jinja2_strcase.StrcaseExtension', RaiseExtension])
+
+            if self.helpers:
+                self.helpers.inject_helpers(env)
+
+            self._env = env
+        return self._env
 
     def render(self, vars: dict, fail_on_error: bool = False) -> Union[RenderedTemplate, FailedTemplate]:
         raw_template = str(self.provider.template(), "utf-8")
 
-        content = None
-        env = Environment(line_statement_prefix="##", undefined=StrictUndefined, extensions=['jinja2_strcase.StrcaseExtension', RaiseExtension])
-
-        if self.helpers:
-            self.helpers.inject_helpers(env)
+        env = self.environment()
 
         content = None
         # This will fail if rendered template can't be processed via Jinja2 (e.g. undefined variable access etc)
         try:
-            content = env.from_string(source=raw_template).render(vars)
+            compiled = self._compiled.get(raw_template)
+            if compiled is None:
+                compiled = self._compiled[raw_template] = env.from_string(source=raw_template)
+            content = compiled.render(vars)
 
             # "@@{{ some expression }}@@" is the same as {{ some expression }}
             #
             # Helps workaround YAML formatting when editing unquoted {{ jinja expression }}
             #
-            content = re.sub(r'"@@(.*)@@"', r"\g<1>", content)
+            content = _UNQUOTE_EXPRESSION.sub(r"\g<1>", content)
 
             return RenderedTemplate(name=self.name, content=content)
         except (BaseException, ValueError) as ex:
@@ -180,7 +239,7 @@ class TemplateWithConfig(Template):
     def __init__(self, provider: GenericProvider, config: Config):
         self.vars = config.vars
 
-        helpers = TemplateHelpers(provider=provider, bucket=CfnBucket(config=config.aws), custom_helpers=config.helpers, config=config)
+        helpers = TemplateHelpers(provider=provider, bucket=CfnBucket.shared(config.aws), custom_helpers=config.helpers, config=config)
 
         # Ugly hack alert. Injecting template commit information to vars.deploy() object here
         try:
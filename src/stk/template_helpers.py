@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import base64
 import contextlib
-import hashlib
 import json
 import os
 import re
@@ -28,6 +27,18 @@ from .ignore_file import parse_ignore_list
 from .multipart_encoder import multipart_encode
 from .config import Config
 from .provider import GenericProvider
+from .util import md5
+
+# resourcify(): runs of '_'/'-' become word breaks, then each word is capitalized and joined
+_RESOURCE_NAME_SEPARATORS = re.compile(r"(_|-)+")
+_RESOURCE_NAME_WORD = re.compile(r"(\A|\W)+(\w)")
+
+# user_data(): json fragments embedded in user data within << >> delimiters. A fragment can't span
+# any of the line boundaries recognised by str.splitlines()
+_USER_DATA_BREAKOUT = re.compile("<<([^\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]+?)>>(?!>)")
+
+# Custom helper functions already loaded in this process, keyed by (helper name, md5 of source)
+_HELPER_CACHE = {}
 
 
 @dataclass
@@ -61,6 +72,11 @@ class TemplateHelpers:
         self.bucket = bucket
         self.config = config
         self.custom_helpers = {}
+        self._env = None
+        # Compiled templates, keyed by template source
+        self._compiled = {}
+        # include_file() results, keyed by arguments
+        self._included = {}
 
         # These are "short-cuts" for use by custom helpers
         self.aws = config.aws
@@ -101,6 +117,24 @@ class TemplateHelpers:
             # https://stackoverflow.com/questions/3431676/creating-functions-in-a-loop
             funcs[name] = self._make_helper_wrapper(func)
 
+    def environment(self) -> Environment:
+        """Jinja2 environment (with helpers injected) for user_data and included files; built on first use"""
+        if self._env is None:
+            # Jinja2 evaluation requires any referenced variables be defined
+            # to avoid hard-to-detect failures.
+            log.debug("setting up jinja environment")
+            env = Environment(line_statement_prefix="##", undefined=jinja2.StrictUndefined)
+            self.inject_helpers(env)
+            self._env = env
+        return self._env
+
+    def compile(self, source: str) -> jinja2.Template:
+        """Compile source with environment(), re-using the result if the same source is compiled again"""
+        compiled = self._compiled.get(source)
+        if compiled is None:
+            compiled = self._compiled[source] = self.environment().from_string(source=source)
+        return compiled
+
     def _make_helper_wrapper(self, func):
         return lambda *args, **kwargs: func(self, *args, **kwargs)
 
@@ -112,7 +146,7 @@ class TemplateHelpers:
         """
         Given a string with non-alphanumeric characters, maps to a string that can be used as an AWS Resource name.
         """
-        return re.sub(r"(\A|\W)+(\w)", lambda m: m.group(2).upper(), re.sub(r"(_|-)+", " ", str(name))).replace(" ", "")
+        return _RESOURCE_NAME_WORD.sub(lambda m: m.group(2).upper(), _RESOURCE_NAME_SEPARATORS.sub(" ", str(name))).replace(" ", "")
 
     IGNORE_FILE = ".package-ignore"
 
@@ -155,12 +189,6 @@ class TemplateHelpers:
         if not self.provider.is_tree(dir):
             raise (Exception(f"{dir} is not a directory"))
 
-        # Jinja2 evaluation requires any referenced variables be defined
-        # to avoid hard-to-detect failures.
-        log.debug("setting up jinja environment")
-        env = jinja2.Environment(line_statement_prefix="##", undefined=jinja2.StrictUndefined)
-        self.inject_helpers(env)
-
         # context for template evaluation is 'config.vars' plus any additional
         # parameters passed. E.g.
         #
@@ -176,7 +204,7 @@ class TemplateHelpers:
                 raise Exception("user_data(): %s is not a regular file" % part_name)
 
             # Userdata files are actually Jinja2 templates in disguise
-            template = env.from_string(source=str(content, "utf-8"))
+            template = self.compile(str(content, "utf-8"))
             log.debug("rendering template for part %s", part_name)
             parts[part_name] = template.render(template_context)
 
@@ -191,16 +219,27 @@ class TemplateHelpers:
         # for example: "hello <<{"Ref": "bar"}>> there <<{}>>" will be mapped
         # to a json array ["hello ", {"Ref": "bar"}, " there ", {}]
         #
+        # Fragments can't span lines, so a single scan over the whole content finds the same
+        # fragments as scanning line by line. The array is the same as splitting each line
+        # around its fragments: one element per line of text, with an empty string wherever a
+        # fragment starts or ends a line.
         log.debug("processing break-outs")
         lines = []
-        for line in encoded.splitlines(keepends=True):
-            parts = re.split("<<(.+?)>>(?!>)", line)
-            for i, match in enumerate(parts):
-                if i % 2:
-                    log.debug("processing json block %s", match)
-                    lines.append(json.loads(match))
-                else:
-                    lines.append(match)
+        pos = 0
+        for match in _USER_DATA_BREAKOUT.finditer(encoded):
+            text = encoded[pos : match.start()].splitlines(keepends=True)
+            lines.extend(text)
+            # Fragment at the start of a line, or directly after another fragment
+            if not text or text[-1].splitlines()[0] != text[-1]:
+                lines.append("")
+            log.debug("processing json block %s", match.group(1))
+            lines.append(json.loads(match.group(1)))
+            pos = match.end()
+        text = encoded[pos:].splitlines(keepends=True)
+        # Fragment at the very end of the content
+        if pos and not text:
+            lines.append("")
+        lines.extend(text)
 
         # Rendering user data as correctly indented content is hard, so
         # don't even bother - just dump out single-line JSON !
@@ -226,12 +265,18 @@ class TemplateHelpers:
             return resource_id
 
     def include_file(self, include_file_name, padding=8, prefix="\n", **extra_vars) -> str:
-        env = Environment(line_statement_prefix="##", undefined=jinja2.StrictUndefined)
-
-        self.inject_helpers(env)
+        # config.vars are fixed for the lifetime of the helpers, so the same arguments always give
+        # the same result. Arguments that can't be hashed (e.g. a list passed as a var) aren't cached.
+        try:
+            # Value types are part of the key, since equal values (1 == True == 1.0) render differently
+            cache_key = (include_file_name, padding, prefix, frozenset((k, type(v), v) for k, v in extra_vars.items()))
+            if cache_key in self._included:
+                return self._included[cache_key]
+        except TypeError:
+            cache_key = None
 
         content = self.provider.content(path.join("files", include_file_name))
-        template = env.from_string(source=str(content, "utf-8"))
+        template = self.compile(str(content, "utf-8"))
 
         # context for evalation is 'config.vars' plus any additional parameters passed via
         # :extra_vars:
@@ -239,6 +284,8 @@ class TemplateHelpers:
 
         indended = "\n".join(map(lambda line: " " * padding + line, result.splitlines())) + "\n"
 
+        if cache_key is not None:
+            self._included[cache_key] = prefix + indended
         return prefix + indended
 
     def upload_zip(self, dir: str, prefix: str = "", returns: str = "key") -> str:
@@ -254,32 +301,46 @@ class TemplateHelpers:
         else:
             raise Exception(f"Unknown 'returns' value {returns} - expect one of (key, s3-uri, http-uri)")
 
+    # Zips are built in memory up to this size, then spill over to a temporary file. Matches the
+    # multipart upload threshold, so in-memory zips are uploaded in a single request.
+    ZIP_SPOOL_SIZE = 8 * 1024 * 1024
+
     def zip_tree(self, dir: str, ignore=None, prefix="") -> ZipContent:
         """
         Compress directory tree (root), setting prefix for files inside zip
         """
         checksums = {}
 
-        tmp_file = tempfile.TemporaryFile()
+        tmp_file = tempfile.SpooledTemporaryFile(max_size=self.ZIP_SPOOL_SIZE)
         with ZipFile(tmp_file, mode="w", compression=ZIP_DEFLATED) as zip:
             log.info(f"Adding files from {dir}")
             count, size = 0, 0
-            for file_path, type, file_content in self.provider.find(dir, ignore):
-                file_size = len(file_content)
-                log.debug(" adding file %s (size=%s, type=%s)", HumanBytes.format(file_size), file_path, type)
+            for file_path, type, chunks in self.provider.find(dir, ignore, stream=True):
                 file_path = path.join(prefix, file_path)
 
+                # Symlinks may be yielded with their target path as a str
+                if isinstance(chunks, str):
+                    chunks = (chunks.encode("utf-8"),)
+
                 # Add file to zip
                 info = ZipInfo(filename=file_path, date_time=time.localtime(time.time())[:6])
-                info.file_size = file_size
+                info.compress_type = ZIP_DEFLATED
 
                 # Set file perm ugo=rx, preserve symlinks - 0xa000 (0x120000) bit
                 info.external_attr = (0o120755 if type == "symlink" else 0o555) << 16
 
-                zip.writestr(info, data=file_content, compress_type=ZIP_DEFLATED)
+                # Content is compressed and checksummed a chunk at a time, so large files aren't
+                # held in memory
+                checksum = md5()
+                with zip.open(info, mode="w") as zip_entry:
+                    for chunk in chunks:
+                        zip_entry.write(chunk)
+                        checksum.update(chunk)
+
+                log.debug(" added file %s (size=%s, type=%s)", file_path, HumanBytes.format(info.file_size), type)
 
                 # Record md5 checksum
-                checksums[path.join(dir, file_path)] = hashlib.md5(str(file_content).encode("utf-8")).hexdigest()
+                checksums[path.join(dir, file_path)] = checksum.hexdigest()
 
                 count += 1
                 size += info.file_size
@@ -288,10 +349,15 @@ class TemplateHelpers:
 
         # final (composite) checksum is based on filenames and content md5s. They are sorted so checksum doesn't
         # vary if files are discovered in different orders.
-        sorted_checksums = sorted(checksums.items())
-        md5sum = hashlib.md5(str(sorted_checksums).encode("utf-8")).hexdigest()
+        composite = md5()
+        for file_path, checksum in sorted(checksums.items()):
+            composite.update(file_path.encode("utf-8"))
+            composite.update(b"\0")
+            composite.update(checksum.encode("ascii"))
+        md5sum = composite.hexdigest()
 
-        tmp_file.seek(0)  # required?
+        # Uploaded from the start of the file
+        tmp_file.seek(0)
 
         return ZipContent(dir, tmp_file, md5sum)
 
@@ -306,6 +372,12 @@ class TemplateHelpers:
         log.debug("retrieving helper %s from provider", mod_file)
         content = self.provider.content(mod_file)
 
+        # Unchanged helper source doesn't need to be written out and executed again
+        cache_key = (name, md5(content).hexdigest())
+        if cache_key in _HELPER_CACHE:
+            log.debug("re-using previously loaded helper %s", mod_file)
+            return _HELPER_CACHE[cache_key]
+
         log.debug("writing helper code to %s", mod_file)
         open(mod_file, "wb").write(content)
 
@@ -321,5 +393,6 @@ class TemplateHelpers:
             raise ImportError(f"{e.strerror}: {mod_file}") from e
 
         helper_func = getattr(module, "helper")
+        _HELPER_CACHE[cache_key] = helper_func
 
         return helper_func
@@ -1,8 +1,13 @@
 import pytest
 
+from copy import copy
+from pathlib import Path
+
 # pylint: disable=missing-docstring
 
 from . import ConfigFixtures
+from .. import config_file as config_file_module
+from ..config_file import ConfigDocument, ConfigFile, ConfigFiles, _find_config_file
 
 
 @pytest.mark.parametrize("config_file", ["includes"], indirect=True)
@@ -17,3 +22,65 @@ class TestConfigFile(ConfigFixtures):
 
     def test_environments(self, config_file):
         assert config_file.environments() == ["dev", "test", "prod"]
+
+
+@pytest.mark.parametrize("config_file", ["includes"], indirect=True)
+class TestConfigFileCache(ConfigFixtures):
+    @pytest.fixture(autouse=True)
+    def parse_cache(self, monkeypatch):
+        # Start from an empty cache, so files parsed by earlier tests don't affect this one
+        monkeypatch.setattr(config_file_module, "_PARSE_CACHE", {})
+
+    def test_parsed_file_is_cached(self, config_file, monkeypatch):
+        assert any(filepath.endswith("main.yaml") for filepath, *_ in config_file_module._PARSE_CACHE)
+
+        # Loading the same (unmodified) file again must not re-parse it
+        def fail(filepath):
+            raise AssertionError(f"{filepath} parsed again")
+
+        monkeypatch.setattr(config_file_module, "_load_yaml_file", fail)
+
+        cached = ConfigFile("main.yaml", config_file.config_dir)
+        assert cached == config_file
+
+
+class TestConfigFiles:
+    def test_layers_follow_list_changes(self):
+        configs = ConfigFiles([ConfigDocument({"vars": {"a": 1}})])
+        assert configs.fetch_dict("vars", "dev") == {"a": 1}
+
+        configs[0] = ConfigDocument({"vars": {"a": 2}})
+        assert configs.fetch_dict("vars", "dev") == {"a": 2}
+
+        configs += [ConfigDocument({"vars": {"b": 3}})]
+        assert configs.fetch_dict("vars", "dev") == {"a": 2, "b": 3}
+
+        configs.pop()
+        assert configs.fetch_dict("vars", "dev") == {"a": 2}
+
+        configs[0:1] = [ConfigDocument({"vars": {"c": 4}})]
+        assert configs.fetch_dict("vars", "dev") == {"c": 4}
+
+    def test_copy_has_its_own_layers(self):
+        configs = ConfigFiles([ConfigDocument({"vars": {"a": 1}})])
+        assert configs.fetch_dict("vars", "dev") == {"a": 1}
+
+        copied = copy(configs)
+        assert type(copied) == ConfigFiles
+        copied.append(ConfigDocument({"vars": {"b": 2}}))
+
+        assert copied.fetch_dict("vars", "dev") == {"a": 1, "b": 2}
+        assert configs.fetch_dict("vars", "dev") == {"a": 1}
+
+
+class TestFindConfigFile:
+    def test_new_yaml_file_takes_precedence_over_cached_yml(self, tmp_path):
+        (tmp_path / "main.yml").write_text("---\n")
+        assert _find_config_file(str(tmp_path), Path("main")) == Path("main.yml")
+
+        (tmp_path / "main.yaml").write_text("---\n")
+        assert _find_config_file(str(tmp_path), Path("main")) == Path("main.yaml")
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            _find_config_file(str(tmp_path), Path("includes", "missing"))
@@ -0,0 +1,22 @@
+import pytest
+import yaml
+
+# pylint: disable=missing-docstring
+
+from ..interpolated_dict import InterpolatedDict, compile_template, parse_value
+
+
+@pytest.mark.parametrize("value", ["hello", "hello world", "us-east-1", "a/b.c", "yes", "Off", "null", "~", "123", "1.5", "0x1f", "a: b", "[1, 2]", "a #b", "2001-01-01"])
+def test_parse_value_matches_yaml(value):
+    assert parse_value(value) == yaml.safe_load(value)
+
+
+def test_interpolated_values():
+    d = InterpolatedDict({"a": "{{ foo }}", "b": "plain string", "c": "{{ foo }}: 1", "d": None, "e": 42}, {"foo": "bar"})
+    assert d == {"a": "bar", "b": "plain string", "c": {"bar": 1}, "d": None, "e": 42}
+
+
+def test_compiled_templates_are_reused():
+    assert compile_template("{{ foo }}-x") is compile_template("{{ foo }}-x")
+    assert InterpolatedDict({"a": "{{ foo }}-x"}, {"foo": "1"}) == {"a": "1-x"}
+    assert InterpolatedDict({"a": "{{ foo }}-x"}, {"foo": "2"}) == {"a": "2-x"}
@@ -98,10 +98,9 @@ class TestStackRefs(ConfigFixtures, StackFixtures):
             refs.output("some-other-stack", "unknown_output")
 
     def create_cfn_mock_response(self, refs):
-        # refs.stacks()
-        for name in refs.stacks().keys():
+        for name in refs.refs.keys():
             # mock the cfn client
-            stubber = Stubber(refs[name].cfn)
+            stubber = Stubber(refs._stack_ref(name).stack.cfn)
             expected_params = {"StackName": f"dev-{name}"}
             response = json.loads(self.fixture_content("mock-describe-stacks-response.json"))
             stubber.add_response("describe_stacks", response, expected_params)
@@ -70,3 +70,6 @@ class TestTemplate(Fixtures):
         rendered = t.render(vars={})
 
         assert "value: ['hello', 'there']" in str(rendered)
+
+        # Multiple expressions on the same line are unquoted separately
+        assert rendered["pair"] == [1, 2]
@@ -64,7 +64,7 @@ class TestTemplateHelpers(StackFixtures):
         helpers = TemplateHelpers(provider, bucket=bucket, custom_helpers=[], config=config)
 
         uri = helpers.lambda_uri("a_function")
-        assert uri.startswith("s3://foo/functions/a_function/6fa3f1707cb555571039137d7970816f.zip")
+        assert uri.startswith("s3://foo/functions/a_function/370388a70ec7b6a54221fd694534ee68.zip")
 
         uri2 = helpers.lambda_uri("a_function")
         assert uri == uri2, "Generated URLs are deterministic"
@@ -77,12 +77,12 @@ class TestTemplateHelpers(StackFixtures):
         uri = helpers.upload_zip("files/test", prefix="/opt/foo")
 
         # Check it has correct url
-        assert uri == "files/test/15315fc306560b9eb8332fe277bf8e95.zip"
+        assert uri == "files/test/9c3eaff0e848d849eb679f3d977a70f3.zip"
 
         # Download file from S3 and check the file is valid ZIP and it contains the
         # expected content
         s3 = config.aws.resource("s3")
-        object = s3.Object(cfn_bucket, "files/test/15315fc306560b9eb8332fe277bf8e95.zip")
+        object = s3.Object(cfn_bucket, "files/test/9c3eaff0e848d849eb679f3d977a70f3.zip")
 
         content = object.get()["Body"].read()
         fh = BytesIO(content)
@@ -101,6 +101,22 @@ class TestTemplateHelpers(StackFixtures):
         assert 'Content-Type: text/x-shellscript; charset="utf-8"\n' in lines
         assert {"Ref": "SomeResource"} in lines
 
+    def test_user_data_breakouts_at_line_boundaries(self, provider, config):
+        helpers = TemplateHelpers(provider, bucket=None, custom_helpers=[], config=config)
+
+        lines = json.loads(helpers.user_data("test2"))["Fn::Base64"]["Fn::Join"][1]
+
+        # Same elements as splitting each line around its fragments, including empty strings
+        start = lines.index("#!/bin/bash\n")
+        assert lines[start : start + 6] == ["#!/bin/bash\n", "", {"Ref": "A"}, " middle ", {"Ref": "B"}, "\n"]
+
+    def test_include_file_distinguishes_equal_values_of_different_types(self, provider, config):
+        helpers = TemplateHelpers(provider, bucket=None, custom_helpers=[], config=config)
+
+        assert helpers.include_file("flag.txt", padding=0, prefix="", flag=1) == "flag=1\n"
+        assert helpers.include_file("flag.txt", padding=0, prefix="", flag=True) == "flag=True\n"
+        assert helpers.include_file("flag.txt", padding=0, prefix="", flag=1) == "flag=1\n"
+
     def test_package_ignore(self, provider, config):
         helpers = TemplateHelpers(provider, bucket=None, custom_helpers=[], config=config)
 
@@ -0,0 +1,29 @@
+import pytest
+import yaml
+
+# pylint: disable=missing-docstring
+
+from .. import SafeDumper
+from ..yaml_emitter import dump_config
+
+
+def pyyaml_dump(config):
+    return yaml.dump(config, Dumper=SafeDumper, default_flow_style=False, explicit_start=True, sort_keys=False)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"includes": ["common"], "environments": {"dev": None, "prod": None}, "template": {"root": "/", "version": "main", "repo": "git@github.com:jwoffindin/stk-templates.git"}},
+        {"aws": {"region": "us-east-1", "cfn_bucket": "cf-templates-us-east-1-abc"}, "core": {"environments": ["dev", "test"]}},
+        {"params": {"Count": 3, "Enabled": False, "Empty": {}, "Subnets": []}},
+        {"vars": {"quoted": "yes", "number": "123", "spaces": "hello world", "nested": [{"a": 1}]}},
+        {},
+        {"description": "abc\n", "x": None},
+        {"description": "line one\nline two\n", "x": None},
+        {"description": "embedded\nnewline", "x": None},
+    ],
+)
+def test_matches_pyyaml(config):
+    assert dump_config(config) == pyyaml_dump(config)
+    assert yaml.safe_load(dump_config(config)) == config
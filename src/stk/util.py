@@ -1,3 +1,4 @@
+import hashlib
 import yaml
 from typing import List, Dict, Union
 
@@ -52,3 +53,13 @@ def parse_override_yaml(overrides: Union[str, None]) -> Dict:
                 return yaml.safe_load(fh)
 
         return yaml.safe_load(overrides)
+
+def md5(data: bytes = b""):
+    """
+    hashlib.md5, flagged as not used for security (checksums/content-addressed keys only) so it
+    isn't blocked on FIPS-enabled systems. usedforsecurity requires Python 3.9+.
+    """
+    try:
+        return hashlib.md5(data, usedforsecurity=False)
+    except TypeError:
+        return hashlib.md5(data)
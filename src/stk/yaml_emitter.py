@@ -0,0 +1,73 @@
+"""
+Minimal block-style YAML emitter for the small configuration documents written by
+`config init` / `config add`.
+
+These documents are simple (nested dicts of strings, empty values and short lists), so
+emitting them directly is much cheaper than running them through the PyYAML emitter. Anything
+that can't be emitted with identical output falls back to PyYAML.
+"""
+import re
+
+import yaml
+
+from . import SafeDumper
+
+# Strings that can be emitted unquoted, and won't be resolved as anything other than a string
+_PLAIN_STRING = re.compile(r"[A-Za-z_/][A-Za-z0-9_./-]*").fullmatch
+
+# Plain scalars that YAML would resolve as bool/null
+_RESERVED_WORDS = frozenset(
+    ["null", "Null", "NULL", "true", "True", "TRUE", "false", "False", "FALSE", "yes", "Yes", "YES", "no", "No", "NO", "on", "On", "ON", "off", "Off", "OFF"]
+)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def dump_config(config: dict) -> str:
+    """
+    Returns `config` as a YAML document, identical to:
+
+        yaml.dump(config, Dumper=SafeDumper, default_flow_style=False, explicit_start=True, sort_keys=False)
+    """
+    try:
+        if not config:
+            raise _Unsupported()
+        lines = ["---"]
+        _emit_mapping(lines, config, 0)
+        return "\n".join(lines) + "\n"
+    except _Unsupported:
+        return yaml.dump(config, Dumper=SafeDumper, default_flow_style=False, explicit_start=True, sort_keys=False)
+
+
+def _emit_mapping(lines: list, mapping: dict, indent: int):
+    for key, value in mapping.items():
+        prefix = " " * indent + _scalar(key) + ":"
+        if value is None:
+            lines.append(prefix)
+        elif isinstance(value, dict):
+            if value:
+                lines.append(prefix)
+                _emit_mapping(lines, value, indent + 2)
+            else:
+                lines.append(prefix + " {}")
+        elif isinstance(value, list):
+            if value:
+                # block sequences inside a mapping are not indented
+                lines.append(prefix)
+                lines.extend(" " * indent + "- " + _scalar(item) for item in value)
+            else:
+                lines.append(prefix + " []")
+        else:
+            lines.append(prefix + " " + _scalar(value))
+
+
+def _scalar(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, str) and _PLAIN_STRING(value) and value not in _RESERVED_WORDS:
+        return value
+    raise _Unsupported()